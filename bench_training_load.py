@@ -0,0 +1,153 @@
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from date_encoding import EPOCH_DAY_SQL, to_epoch_day
+from personal_records import create_personal_records
+from training_load import (ACUTE_DAYS, CHRONIC_DAYS, create_training_load_index, load_daily_arrays,
+                           daily_load_matrix, compute_acwr, rolling_acwr, flag_members)
+
+EXERCISES = ['벤치프레스', '스쿼트', '데드리프트', '풀업', '푸쉬업', '런닝머신', '사이클']
+
+# 합성 운동 기록 배열 생성 (회원마다 주 sessions_per_week 회)
+def synthesize(members, days, sessions_per_week, seed):
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(days * sessions_per_week / 7, size=members)
+    member_ids = np.repeat(np.arange(1, members + 1, dtype=np.int64), counts)
+    day_offsets = rng.integers(0, days, size=len(member_ids), dtype=np.int64)
+    loads = rng.uniform(1000, 6000, size=len(member_ids))
+    return member_ids, day_offsets, loads
+
+# 측정용 데이터베이스 생성: 합성 기록을 오늘까지 days 일 동안의 운동 기록으로 저장
+# 운영 DB 와 같은 date_day 생성 컬럼과 인덱스(훈련 부하, 개인 기록)를 적재 후에 만듦
+def build_database(path, member_ids, day_offsets, days, seed, batch_size=100000):
+    rng = np.random.default_rng(seed)
+    today = datetime.now().date()
+    dates = [(today - timedelta(days=days - 1 - day)).isoformat() for day in range(days)]
+
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute('''
+        CREATE TABLE workout_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            exercise_name TEXT,
+            sets INTEGER,
+            reps INTEGER,
+            weight REAL,
+            duration INTEGER,
+            calories_burned INTEGER,
+            date DATE
+        )
+    ''')
+    cursor.execute(f'''
+        ALTER TABLE workout_records ADD COLUMN date_day INTEGER
+        GENERATED ALWAYS AS ({EPOCH_DAY_SQL.format(column='date')}) VIRTUAL
+    ''')
+
+    for start in range(0, len(member_ids), batch_size):
+        end = min(start + batch_size, len(member_ids))
+        size = end - start
+        cursor.executemany('''
+            INSERT INTO workout_records
+            (member_id, exercise_name, sets, reps, weight, duration, calories_burned, date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', zip(member_ids[start:end].tolist(),
+                 [EXERCISES[i] for i in rng.integers(0, len(EXERCISES), size)],
+                 rng.integers(3, 6, size).tolist(), rng.integers(8, 16, size).tolist(),
+                 rng.integers(20, 101, size).astype(float).tolist(), rng.integers(30, 91, size).tolist(),
+                 rng.integers(150, 401, size).tolist(), [dates[day] for day in day_offsets[start:end]]))
+    conn.commit()
+
+    create_training_load_index(cursor)
+    create_personal_records(cursor)
+    cursor.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+# 비교용: 회원별 파이썬 반복문으로 최근 ACWR 계산
+def python_loop_acwr(member_ids, day_offsets, loads, days):
+    per_member = {}
+    for member_id, day, load in zip(member_ids.tolist(), day_offsets.tolist(), loads.tolist()):
+        per_member.setdefault(member_id, []).append((day, load))
+
+    result = {}
+    for member_id, sessions in per_member.items():
+        acute = sum(load for day, load in sessions if day >= days - ACUTE_DAYS) / ACUTE_DAYS
+        chronic = sum(load for day, load in sessions if day >= days - CHRONIC_DAYS) / CHRONIC_DAYS
+        result[member_id] = acute / chronic if chronic else 0.0
+    return result
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<40}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="회원별 훈련 부하(ACWR) 벡터화 계산 벤치마크")
+    parser.add_argument("--members", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sessions-per-week", type=float, default=3.0)
+    parser.add_argument("--chunk", type=int, default=10000, help="일별 ACWR 추이를 계산할 회원 묶음 크기")
+    parser.add_argument("--loop-sample", type=int, default=2000, help="파이썬 반복문 비교에 사용할 회원 수")
+    parser.add_argument("--db", help="지정하면 실제 데이터베이스로 load_daily_arrays/flag_members 도 측정 "
+                                     "(파일이 없으면 위 합성 데이터로 생성)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    member_ids, day_offsets, loads = timed(
+        "합성 데이터 생성", lambda: synthesize(args.members, args.days, args.sessions_per_week, args.seed))
+    print(f"회원 {args.members:,}명 x {args.days}일, 운동 기록 {len(member_ids):,}건")
+
+    members, matrix = timed("회원 x 일 부하 행렬 (bincount)",
+                            lambda: daily_load_matrix(member_ids, day_offsets, loads, args.days))
+    matrix = matrix.astype(np.float32)
+
+    acute, chronic, ratio = timed("최근 ACWR (전 회원 한 번에)", lambda: compute_acwr(matrix))
+    overtraining = int((ratio > 1.5).sum())
+    detraining = int(((chronic > 0) & (ratio < 0.8)).sum())
+    print(f"과훈련 {overtraining:,}명, 훈련 감소 {detraining:,}명")
+
+    def rolling_all():
+        flagged_days = 0
+        for start in range(0, len(members), args.chunk):
+            series = rolling_acwr(matrix[start:start + args.chunk])
+            flagged_days += int((series > 1.5).sum())
+        return flagged_days
+
+    flagged_days = timed("1년 일별 ACWR 추이 (누적합)", rolling_all)
+    print(f"과훈련 (회원, 일) 수: {flagged_days:,}")
+
+    # 파이썬 반복문은 일부 회원만 측정 후 전체로 환산
+    sample = member_ids <= args.loop_sample
+    start = time.perf_counter()
+    python_loop_acwr(member_ids[sample], day_offsets[sample], loads[sample], args.days)
+    elapsed = time.perf_counter() - start
+    print(f"{'파이썬 반복문 (전체 회원 환산)':<40}{elapsed * args.members / args.loop_sample * 1000:>10.1f} ms")
+
+    if args.db:
+        if not os.path.exists(args.db):
+            timed(f"데이터베이스 생성 ({args.db})",
+                  lambda: build_database(args.db, member_ids, day_offsets, args.days, args.seed))
+            print(f"파일 크기: {os.path.getsize(args.db) / 1024 / 1024:.1f}MB")
+
+        conn = sqlite3.connect(args.db)
+        today = datetime.now().date()
+        rows = conn.execute("SELECT COUNT(*) FROM workout_records WHERE date_day >= ?",
+                            (to_epoch_day(today) - (CHRONIC_DAYS - 1),)).fetchone()[0]
+        print(f"최근 {CHRONIC_DAYS}일 운동 기록: {rows:,}건")
+        # 첫 번째 측정은 페이지 캐시를 채우므로 두 번 측정
+        for label in ("첫 실행", "두 번째"):
+            arrays = timed(f"load_daily_arrays ({label})", lambda: load_daily_arrays(conn, today))
+            flagged = timed(f"flag_members ({label}, 조회 + 계산)", lambda: flag_members(conn, today))
+        print(f"(회원, 일) 행: {len(arrays[0]):,}건, 경고 대상 회원: {len(flagged):,}명")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from booking import create_waitlist_table, cancel_booking
+
+# 벤치마크용 데이터베이스 생성 (모든 수업 만석 + 대기자 명단)
+def build_database(path, num_classes, capacity, waiters, wal):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+
+    if wal:
+        cursor.execute("PRAGMA journal_mode=WAL")
+
+    cursor.execute('''
+        CREATE TABLE classes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_name TEXT NOT NULL,
+            trainer_id INTEGER,
+            date DATE,
+            time TEXT,
+            duration INTEGER,
+            max_capacity INTEGER,
+            current_bookings INTEGER DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            class_id INTEGER,
+            booking_date DATE,
+            status TEXT DEFAULT 'confirmed'
+        )
+    ''')
+    create_waitlist_table(cursor)
+
+    member_id = 0
+    for class_id in range(1, num_classes + 1):
+        cursor.execute('''
+            INSERT INTO classes (id, class_name, trainer_id, date, time, duration, max_capacity, current_bookings)
+            VALUES (?, ?, 1, '2099-01-01', '19:00', 60, ?, ?)
+        ''', (class_id, f"수업 {class_id}", capacity, capacity))
+
+        bookings = []
+        for _ in range(capacity):
+            member_id += 1
+            bookings.append((member_id, class_id, '2099-01-01'))
+        cursor.executemany('''
+            INSERT INTO bookings (member_id, class_id, booking_date) VALUES (?, ?, ?)
+        ''', bookings)
+
+        waitlist = []
+        for position in range(1, waiters + 1):
+            member_id += 1
+            waitlist.append((class_id, member_id, position))
+        cursor.executemany('''
+            INSERT INTO waitlist (class_id, member_id, position) VALUES (?, ?, ?)
+        ''', waitlist)
+
+    conn.commit()
+
+    cursor.execute("SELECT id FROM bookings ORDER BY id")
+    booking_ids = [row[0] for row in cursor.fetchall()]
+    conn.close()
+
+    return booking_ids
+
+# 작업자 스레드: 각자 연결을 열고 할당된 예약을 취소
+def worker(path, booking_ids, latencies, errors, lock):
+    conn = sqlite3.connect(path, timeout=30)
+    local_latencies = []
+    local_errors = 0
+
+    for booking_id in booking_ids:
+        start = time.perf_counter()
+        try:
+            cancel_booking(conn, booking_id)
+        except sqlite3.OperationalError:
+            # SQLITE_BUSY (database is locked)
+            local_errors += 1
+        local_latencies.append(time.perf_counter() - start)
+
+    conn.close()
+
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+# current_bookings와 실제 확정 예약 수 일치 여부 확인
+def check_consistency(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT COUNT(*)
+        FROM classes c
+        WHERE c.current_bookings != (
+            SELECT COUNT(*) FROM bookings b WHERE b.class_id = c.id AND b.status = 'confirmed'
+        )
+    ''')
+    drifted = cursor.fetchone()[0]
+    conn.close()
+    return drifted
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def main():
+    parser = argparse.ArgumentParser(description="예약 취소/대기자 승급 동시 처리 벤치마크")
+    parser.add_argument("--classes", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=20)
+    parser.add_argument("--waiters", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--wal", action="store_true", help="WAL 저널 모드 사용")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_waitlist.db")
+        booking_ids = build_database(path, args.classes, args.capacity, args.waiters, args.wal)
+
+        # 스레드마다 수업을 섞어서 취소하도록 예약 ID를 분배
+        chunks = [booking_ids[i::args.threads] for i in range(args.threads)]
+        latencies, errors, lock = [], [], threading.Lock()
+        threads = [threading.Thread(target=worker, args=(path, chunk, latencies, errors, lock))
+                   for chunk in chunks]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        print(f"취소 요청: {len(booking_ids)}건, 스레드: {args.threads}, WAL: {args.wal}")
+        print(f"총 소요 시간: {elapsed:.3f}s, 처리량: {len(booking_ids) / elapsed:.1f} ops/s")
+        print(f"지연 시간 p50: {percentile(latencies, 50) * 1000:.2f}ms, "
+              f"p95: {percentile(latencies, 95) * 1000:.2f}ms, "
+              f"p99: {percentile(latencies, 99) * 1000:.2f}ms, "
+              f"평균: {statistics.mean(latencies) * 1000:.2f}ms")
+        print(f"SQLITE_BUSY 오류: {sum(errors)}건")
+        print(f"current_bookings 불일치 수업: {check_consistency(path)}개")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from datetime import datetime
+
+# 대기자 명단 테이블 생성 (수업별 선착순, (class_id, position) 인덱스, 수업당 회원 한 번만 대기)
+def create_waitlist_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS waitlist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_id INTEGER NOT NULL,
+            member_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (class_id) REFERENCES classes (id),
+            FOREIGN KEY (member_id) REFERENCES members (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_waitlist_class_position
+        ON waitlist (class_id, position)
+    ''')
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_waitlist_class_member'")
+    if cursor.fetchone() is None:
+        # 기존 데이터 정리: 이미 확정 예약이 있는 대기와 같은 수업의 중복 대기(가장 앞 순번만 남김) 삭제
+        cursor.execute('''
+            DELETE FROM waitlist
+            WHERE EXISTS (
+                SELECT 1 FROM bookings b
+                WHERE b.class_id = waitlist.class_id AND b.member_id = waitlist.member_id
+                  AND b.status = 'confirmed'
+            )
+        ''')
+        cursor.execute('''
+            DELETE FROM waitlist
+            WHERE position > (
+                SELECT MIN(w.position) FROM waitlist w
+                WHERE w.class_id = waitlist.class_id AND w.member_id = waitlist.member_id
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE UNIQUE INDEX idx_waitlist_class_member
+            ON waitlist (class_id, member_id)
+        ''')
+
+# 수업 예약 (만석이면 대기자 명단에 등록)
+# 반환값: ('confirmed', None) 또는 ('waitlisted', 대기 순번), 수업이 없으면 (None, None)
+# 이미 확정 예약이나 대기가 있는 회원이면 ('duplicate', None)
+def book_class(conn, class_id, member_id):
+    cursor = conn.cursor()
+
+    # 정원 확인과 예약을 하나의 짧은 쓰기 트랜잭션으로 처리
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("SELECT max_capacity, current_bookings FROM classes WHERE id = ?", (class_id,))
+        row = cursor.fetchone()
+        if row is None:
+            conn.rollback()
+            return None, None
+
+        # 같은 수업에 확정 예약이나 대기가 있으면 다시 등록하지 않음
+        cursor.execute('''
+            SELECT 1 FROM bookings WHERE class_id = ? AND member_id = ? AND status = 'confirmed'
+            UNION ALL
+            SELECT 1 FROM waitlist WHERE class_id = ? AND member_id = ?
+            LIMIT 1
+        ''', (class_id, member_id, class_id, member_id))
+        if cursor.fetchone() is not None:
+            conn.rollback()
+            return 'duplicate', None
+
+        capacity, current = row
+        if current < capacity:
+            cursor.execute('''
+                INSERT INTO bookings (member_id, class_id, booking_date)
+                VALUES (?, ?, ?)
+            ''', (member_id, class_id, datetime.now().date()))
+
+            cursor.execute('''
+                UPDATE classes SET current_bookings = current_bookings + 1 WHERE id = ?
+            ''', (class_id,))
+            result = ('confirmed', None)
+        else:
+            # 마지막 순번은 (class_id, position) 인덱스로 바로 조회
+            cursor.execute('''
+                SELECT COALESCE(MAX(position), 0) + 1 FROM waitlist WHERE class_id = ?
+            ''', (class_id,))
+            position = cursor.fetchone()[0]
+
+            cursor.execute('''
+                INSERT INTO waitlist (class_id, member_id, position)
+                VALUES (?, ?, ?)
+            ''', (class_id, member_id, position))
+            result = ('waitlisted', waitlist_rank(conn, class_id, position))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return result
+
+# 대기 순번 (앞에 남은 대기자 수 + 1)
+def waitlist_rank(conn, class_id, position):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT COUNT(*) FROM waitlist WHERE class_id = ? AND position <= ?
+    ''', (class_id, position))
+    return cursor.fetchone()[0]
+
+# 예약 취소 및 첫 번째 대기자 자동 승급
+# 반환값: (취소 여부, 승급된 회원 ID 또는 None)
+def cancel_booking(conn, booking_id):
+    cursor = conn.cursor()
+
+    # 취소, 승급, current_bookings 조정을 하나의 짧은 트랜잭션으로 처리
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute('''
+            UPDATE bookings SET status = 'cancelled' WHERE id = ? AND status = 'confirmed'
+        ''', (booking_id,))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return False, None
+
+        cursor.execute("SELECT class_id FROM bookings WHERE id = ?", (booking_id,))
+        class_id = cursor.fetchone()[0]
+
+        # 첫 번째 대기자 (class_id, position) 인덱스 사용
+        cursor.execute('''
+            SELECT id, member_id FROM waitlist
+            WHERE class_id = ?
+            ORDER BY position
+            LIMIT 1
+        ''', (class_id,))
+        waiter = cursor.fetchone()
+
+        if waiter:
+            waitlist_id, promoted_member_id = waiter
+            cursor.execute("DELETE FROM waitlist WHERE id = ?", (waitlist_id,))
+            cursor.execute('''
+                INSERT INTO bookings (member_id, class_id, booking_date)
+                VALUES (?, ?, ?)
+            ''', (promoted_member_id, class_id, datetime.now().date()))
+            # 빈자리를 대기자가 채우므로 current_bookings는 그대로 유지
+        else:
+            promoted_member_id = None
+            cursor.execute('''
+                UPDATE classes SET current_bookings = current_bookings - 1
+                WHERE id = ? AND current_bookings > 0
+            ''', (class_id,))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return True, promoted_member_id
+
+# 대기 취소
+def leave_waitlist(conn, waitlist_id):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM waitlist WHERE id = ?", (waitlist_id,))
+    conn.commit()
+    return cursor.rowcount > 0
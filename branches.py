@@ -0,0 +1,37 @@
+import json
+import os
+
+# 지점 설정 파일 경로 (환경 변수로 바꿀 수 있음)
+BRANCHES_FILE = os.environ.get('GYM_BRANCHES_FILE', 'branches.json')
+
+# 설정 파일이 없을 때: 기존 단일 데이터베이스를 본점으로 사용
+DEFAULT_BRANCHES = {
+    '본점': {'db': 'gym_management.db', 'snapshot': 'gym_analytics.db'},
+}
+
+# 운영 DB 경로에서 분석용 스냅샷 경로 만들기 (branch.db -> branch_analytics.db)
+def default_snapshot_path(db_path):
+    base, ext = os.path.splitext(db_path)
+    return f"{base}_analytics{ext or '.db'}"
+
+# 지점 설정 읽기: {지점명: {'db': 운영 DB 경로, 'snapshot': 분석용 스냅샷 경로}}
+# branches.json 예시: {"강남점": {"db": "data/gangnam.db"}, "홍대점": "data/hongdae.db"}
+def load_branches(path=BRANCHES_FILE):
+    if not os.path.exists(path):
+        return {name: dict(entry) for name, entry in DEFAULT_BRANCHES.items()}
+
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    branches = {}
+    for name, entry in config.items():
+        if isinstance(entry, str):
+            entry = {'db': entry}
+        branches[name] = {
+            'db': entry['db'],
+            'snapshot': entry.get('snapshot') or default_snapshot_path(entry['db']),
+        }
+
+    if not branches:
+        raise ValueError(f"{path} 에 지점이 없습니다.")
+    return branches
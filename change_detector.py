@@ -0,0 +1,56 @@
+import sqlite3
+import threading
+
+# 변경 감지 대상 테이블
+TRACKED_TABLES = ['members', 'trainers', 'workout_records', 'classes', 'bookings', 'waitlist']
+
+# 테이블별 변경 카운터와 이를 올리는 트리거 생성
+def create_change_tracking(cursor, tables=TRACKED_TABLES):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    for table in tables:
+        cursor.execute("INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", (table,))
+
+        for op in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_version
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+# PRAGMA data_version 과 테이블별 변경 카운터로 변경 여부를 확인
+# data_version 은 다른 연결이 커밋했을 때만 바뀌므로 감시 전용 연결을 계속 유지
+class ChangeDetector:
+    def __init__(self, db_path='gym_management.db'):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._versions = {}
+
+    # 테이블별 버전 {테이블명: 버전}
+    # 파일 전체에 변경이 없으면 카운터 테이블을 읽지 않고 이전 값을 반환
+    def versions(self):
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                rows = self._conn.execute("SELECT table_name, version FROM table_versions").fetchall()
+                self._versions = dict(rows)
+                self._data_version = data_version
+            return dict(self._versions)
+
+    # 지정한 테이블들의 버전 묶음 (캐시 키로 사용)
+    def token(self, tables):
+        versions = self.versions()
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,188 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 변경 이력을 남길 테이블
+CHANGE_LOG_TABLES = ['members', 'workout_records', 'classes', 'bookings']
+
+# 추가 전용 변경 이력 테이블과 트리거 생성
+# seq 는 AUTOINCREMENT 라서 오래된 이력을 지워도 다시 쓰이지 않음 (소비자 커서가 항상 앞으로만 진행)
+# 이력은 트리거가 기록한 시점 이후의 변경만 담으므로, 새 소비자는 전체 적재 후 latest_seq 부터 읽기 시작
+def create_change_log(cursor, tables=CHANGE_LOG_TABLES):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            ts TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+        )
+    ''')
+
+    for table in tables:
+        for op, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_change_log
+                AFTER {op} ON {table}
+                BEGIN
+                    INSERT INTO change_log (table_name, op, row_id) VALUES ('{table}', '{op.lower()}', {row}.id);
+                END
+            ''')
+
+# 마지막 변경 번호 (이력이 없으면 0, 이력을 모두 지운 뒤에도 sqlite_sequence 에 남은 값을 사용)
+def latest_seq(conn):
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return row[0] if row else 0
+
+# cursor 이후의 변경을 seq 순서로 최대 limit 건 조회 (기본 키 범위 검색)
+# 반환값: [{'seq', 'table', 'op', 'row_id', 'ts'}] - 다음 호출에는 마지막 항목의 seq 를 cursor 로 전달
+def changes_since(conn, cursor=0, limit=1000, tables=None):
+    sql = "SELECT seq, table_name, op, row_id, ts FROM change_log WHERE seq > ?"
+    params = [cursor]
+    if tables:
+        sql += f" AND table_name IN ({','.join('?' * len(tables))})"
+        params.extend(tables)
+    sql += " ORDER BY seq LIMIT ?"
+    params.append(limit)
+
+    return [{'seq': seq, 'table': table, 'op': op, 'row_id': row_id, 'ts': ts}
+            for seq, table, op, row_id, ts in conn.execute(sql, params).fetchall()]
+
+# 변경된 행의 현재 값을 테이블별로 한 번에 조회해 change['row'] 에 붙임
+# 내보내는 시점의 값이므로 같은 행이 여러 번 바뀌었으면 모두 최신 값, 삭제된 행은 None
+def attach_rows(conn, changes):
+    row_ids = {}
+    for change in changes:
+        row_ids.setdefault(change['table'], set()).add(change['row_id'])
+
+    rows = {}
+    for table, ids in row_ids.items():
+        ids = list(ids)
+        cursor = conn.execute(f"SELECT * FROM {table} WHERE id IN ({','.join('?' * len(ids))})", ids)
+        columns = [column[0] for column in cursor.description]
+        for values in cursor.fetchall():
+            row = dict(zip(columns, values))
+            rows[(table, row['id'])] = row
+
+    for change in changes:
+        change['row'] = rows.get((change['table'], change['row_id']))
+    return changes
+
+# 보존 기간이 지난 이력 삭제 (max_seq 를 주면 그 커서까지 내보낸 이력만 삭제)
+def prune_change_log(conn, keep_days=30, max_seq=None):
+    sql = "DELETE FROM change_log WHERE ts < datetime('now', 'localtime', ?)"
+    params = [f'-{keep_days} days']
+    if max_seq is not None:
+        sql += " AND seq <= ?"
+        params.append(max_seq)
+    cursor = conn.execute(sql, params)
+    conn.commit()
+    return cursor.rowcount
+
+def read_cursor(cursor_path):
+    if not os.path.exists(cursor_path):
+        return None
+    with open(cursor_path, encoding='utf-8') as f:
+        return int(f.read().strip() or 0)
+
+# 커서 파일은 임시 파일에 쓴 뒤 교체 (중간에 죽어도 이전 값 또는 새 값만 남음)
+def write_cursor(cursor_path, seq):
+    tmp_path = cursor_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(str(seq))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, cursor_path)
+
+# 커서 이후 변경을 날짜별 NDJSON 파일(changes-YYYYMMDD.ndjson)에 이어 쓰고 커서 파일 갱신
+# 파일을 디스크에 반영한 뒤 커서를 옮기므로 중단되면 같은 변경이 다시 나갈 수 있음 (소비자는 seq 로 중복 제거)
+def export_changes(db_path='gym_management.db', out_dir='change_export', cursor_path=None,
+                   batch_size=1000, with_rows=True, from_latest=False):
+    os.makedirs(out_dir, exist_ok=True)
+    cursor_path = cursor_path or os.path.join(out_dir, 'cursor')
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = read_cursor(cursor_path)
+        if cursor is None:
+            cursor = latest_seq(conn) if from_latest else 0
+            write_cursor(cursor_path, cursor)
+
+        exported = 0
+        while True:
+            changes = changes_since(conn, cursor, batch_size)
+            if not changes:
+                break
+            if with_rows:
+                attach_rows(conn, changes)
+
+            out_path = os.path.join(out_dir, f"changes-{datetime.now().strftime('%Y%m%d')}.ndjson")
+            with open(out_path, 'a', encoding='utf-8') as f:
+                for change in changes:
+                    f.write(json.dumps(change, ensure_ascii=False, default=str) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+            cursor = changes[-1]['seq']
+            write_cursor(cursor_path, cursor)
+            exported += len(changes)
+    finally:
+        conn.close()
+
+    if exported:
+        logger.info("변경 이력 %d건 내보냄 (커서 %d)", exported, cursor)
+    return exported, cursor
+
+# 변경 이력을 계속 따라가며 내보내기 (PRAGMA data_version 이 바뀐 경우에만 조회)
+def follow_changes(db_path='gym_management.db', out_dir='change_export', cursor_path=None,
+                   interval=1.0, **kwargs):
+    watch = sqlite3.connect(db_path)
+    last_version = None
+    try:
+        while True:
+            data_version = watch.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != last_version:
+                export_changes(db_path, out_dir, cursor_path, **kwargs)
+                last_version = data_version
+            time.sleep(interval)
+    finally:
+        watch.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="변경 이력(change_log)을 NDJSON 파일로 내보내기")
+    parser.add_argument("--db", default="gym_management.db")
+    parser.add_argument("--out", default="change_export", help="NDJSON 파일과 커서 파일을 저장할 디렉터리")
+    parser.add_argument("--cursor-file", help="기본값: <out>/cursor")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--no-rows", action="store_true", help="변경된 행의 현재 값은 빼고 이력만 내보냄")
+    parser.add_argument("--from-latest", action="store_true",
+                        help="커서 파일이 없을 때 처음부터가 아니라 현재 마지막 변경 이후부터 시작")
+    parser.add_argument("--follow", action="store_true", help="종료하지 않고 새 변경을 계속 내보냄")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--prune-days", type=int, help="내보낸 뒤 지정한 일수보다 오래된 이력 삭제")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    options = dict(batch_size=args.batch_size, with_rows=not args.no_rows, from_latest=args.from_latest)
+
+    if args.follow:
+        follow_changes(args.db, args.out, args.cursor_file, args.interval, **options)
+        return
+
+    exported, cursor = export_changes(args.db, args.out, args.cursor_file, **options)
+    print(f"내보낸 변경: {exported}건, 커서: {cursor}")
+
+    if args.prune_days is not None:
+        conn = sqlite3.connect(args.db)
+        pruned = prune_change_log(conn, args.prune_days, max_seq=cursor)
+        conn.close()
+        print(f"삭제한 이력: {pruned}건")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from personal_records import create_personal_records, e1rm_sql, volume_sql
+
+EXERCISES = ['벤치프레스', '스쿼트', '데드리프트']
+
+# 검사용 데이터베이스 생성 (운동 기록 테이블 + 개인 기록 트리거)
+def build_database(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE workout_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            exercise_name TEXT,
+            sets INTEGER,
+            reps INTEGER,
+            weight REAL,
+            duration INTEGER,
+            calories_burned INTEGER,
+            date DATE
+        )
+    ''')
+    create_personal_records(cursor)
+    conn.commit()
+    return conn
+
+def random_record(rng, members):
+    return (rng.randint(1, members), rng.choice(EXERCISES), rng.randint(1, 5), rng.randint(1, 12),
+            rng.choice([None, 20.0, 40.0, 60.0, 80.0, 100.0]), f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+
+# 무작위 추가/삭제/수정 (무게가 NULL 인 기록과 여러 행을 한 번에 지우는 삭제 포함)
+def random_operations(conn, rng, operations, members):
+    cursor = conn.cursor()
+    for _ in range(operations):
+        op = rng.random()
+        if op < 0.5:
+            cursor.execute('''
+                INSERT INTO workout_records (member_id, exercise_name, sets, reps, weight, date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', random_record(rng, members))
+        elif op < 0.7:
+            cursor.execute("DELETE FROM workout_records WHERE id = (SELECT id FROM workout_records ORDER BY random() LIMIT 1)")
+        elif op < 0.72:
+            cursor.execute("DELETE FROM workout_records WHERE member_id = ? AND exercise_name = ?",
+                           (rng.randint(1, members), rng.choice(EXERCISES)))
+        else:
+            column, value = rng.choice([
+                ('member_id', rng.randint(1, members)),
+                ('exercise_name', rng.choice(EXERCISES)),
+                ('weight', rng.choice([None, 10.0, 60.0, 120.0])),
+                ('reps', rng.randint(1, 20)),
+                ('sets', rng.randint(1, 6)),
+                ('date', f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"),
+                ('calories_burned', rng.randint(100, 400)),
+            ])
+            cursor.execute(f"UPDATE workout_records SET {column} = ? WHERE id = (SELECT id FROM workout_records ORDER BY random() LIMIT 1)",
+                           (value,))
+    conn.commit()
+
+# 트리거로 유지한 개인 기록과 GROUP BY 로 처음부터 다시 계산한 결과의 차이
+def compare(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT member_id, exercise_name, max_weight, best_e1rm, best_volume, sessions, last_date
+        FROM personal_records
+    ''')
+    maintained = {row[:2]: row[2:] for row in cursor.fetchall()}
+
+    cursor.execute(f'''
+        SELECT member_id, exercise_name, MAX(weight), MAX({e1rm_sql()}), MAX({volume_sql()}), COUNT(*), MAX(date)
+        FROM workout_records
+        GROUP BY member_id, exercise_name
+    ''')
+    expected = {row[:2]: row[2:] for row in cursor.fetchall()}
+
+    return [(key, maintained.get(key), expected.get(key))
+            for key in sorted(set(maintained) | set(expected), key=str)
+            if maintained.get(key) != expected.get(key)]
+
+# 같은 최고치를 가진 기록을 한 번에 삭제하는 시간 (기록 수에 비례해야 함)
+def time_tied_delete(conn, rows):
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO workout_records (member_id, exercise_name, sets, reps, weight, date)
+        VALUES (0, '벤치프레스', 5, 5, 100.0, '2026-01-01')
+    ''', [()] * rows)
+    conn.commit()
+
+    start = time.perf_counter()
+    cursor.execute("DELETE FROM workout_records WHERE member_id = 0")
+    conn.commit()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="개인 기록 트리거 검사: 무작위 변경 후 GROUP BY 재계산 결과와 비교")
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--tied-rows", type=int, nargs='*', default=[2000, 4000, 20000],
+                        help="같은 최고치를 가진 기록을 한 번에 삭제하는 시간 측정 (행 수)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failed = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(os.path.join(tmp, 'check.db'))
+        random_operations(conn, rng, args.operations, args.members)
+        mismatches = compare(conn)
+        print(f"무작위 변경 {args.operations}건 후 불일치: {len(mismatches)}건")
+        for key, maintained, expected in mismatches[:10]:
+            print(f"  {key}: 트리거 {maintained} / 재계산 {expected}")
+        failed = bool(mismatches)
+
+        for rows in args.tied_rows:
+            elapsed = time_tied_delete(conn, rows)
+            print(f"같은 최고치 {rows}건 일괄 삭제: {elapsed:.3f}s")
+        mismatches = compare(conn)
+        if mismatches:
+            print(f"일괄 삭제 후 불일치: {len(mismatches)}건")
+            failed = True
+        conn.close()
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
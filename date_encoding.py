@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta
+
+# 날짜를 1970-01-01 기준 일 수(정수)로 저장하는 생성 컬럼
+# 기존 TEXT 날짜 컬럼은 그대로 두고, 조회는 정수 컬럼의 인덱스 범위 검색으로 처리
+
+EPOCH = date(1970, 1, 1)
+
+# julianday 를 1970-01-01 기준 일 수로 바꾸는 식
+EPOCH_DAY_SQL = "CAST(julianday({column}) - 2440587.5 AS INTEGER)"
+
+# SQL 에서 오늘의 일 수 (상수식이라 한 번만 계산되고 인덱스 범위 검색에 그대로 사용됨)
+TODAY_DAY_SQL = "CAST(julianday('now') - 2440587.5 AS INTEGER)"
+
+# (테이블, 날짜 컬럼, 일 수 컬럼)
+DATE_COLUMNS = [
+    ('members', 'start_date', 'start_day'),
+    ('members', 'end_date', 'end_day'),
+    ('workout_records', 'date', 'date_day'),
+    ('classes', 'date', 'date_day'),
+    ('bookings', 'booking_date', 'booking_day'),
+]
+
+# 달력 구간 생성 컬럼: 월(YYYYMM), 요일(0=일요일, strftime('%w') 와 동일), 월 중 주차(1~4)
+CALENDAR_COLUMNS = [
+    ('workout_records', 'month_key', "CAST(strftime('%Y%m', date) AS INTEGER)"),
+    ('workout_records', 'weekday', "(date_day + 4) % 7"),
+    ('workout_records', 'month_week', "MIN((CAST(strftime('%d', date) AS INTEGER) - 1) / 7 + 1, 4)"),
+]
+
+# 정수 날짜/달력 컬럼용 인덱스
+DATE_INDEXES = [
+    ('idx_members_end_day', 'members', 'end_day, status'),
+    ('idx_workout_records_day_calendar', 'workout_records', 'date_day, weekday, month_week'),
+    ('idx_workout_records_month', 'workout_records', 'month_key, calories_burned'),
+    ('idx_classes_date_day', 'classes', 'date_day, time'),
+    ('idx_bookings_booking_day', 'bookings', 'booking_day'),
+]
+
+# 파이썬 날짜 -> 일 수
+def to_epoch_day(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        value = datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return (value - EPOCH).days
+
+# 일 수 -> 파이썬 날짜
+def from_epoch_day(day):
+    if day is None:
+        return None
+    return EPOCH + timedelta(days=int(day))
+
+# 월 키(YYYYMM) -> 'YYYY-MM'
+def format_month_key(month_key):
+    return f"{int(month_key) // 100:04d}-{int(month_key) % 100:02d}"
+
+def _columns(cursor, table):
+    # table_info 에는 생성 컬럼이 나오지 않으므로 table_xinfo 사용
+    cursor.execute(f"PRAGMA table_xinfo({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+# 정수 날짜 생성 컬럼과 인덱스 추가 (이미 있으면 건너뜀)
+def migrate_date_columns(cursor):
+    for table, column, day_column in DATE_COLUMNS:
+        if day_column not in _columns(cursor, table):
+            cursor.execute(f'''
+                ALTER TABLE {table} ADD COLUMN {day_column} INTEGER
+                GENERATED ALWAYS AS ({EPOCH_DAY_SQL.format(column=column)}) VIRTUAL
+            ''')
+
+    for table, column, expression in CALENDAR_COLUMNS:
+        if column not in _columns(cursor, table):
+            cursor.execute(f'''
+                ALTER TABLE {table} ADD COLUMN {column} INTEGER
+                GENERATED ALWAYS AS ({expression}) VIRTUAL
+            ''')
+
+    for index_name, table, columns in DATE_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})")
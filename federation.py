@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from snapshot import connect_snapshot
+
+# 전 지점 통합 집계
+# 각 지점 스냅샷에서는 합계/개수 같은 부분 집계만 계산하고, 평균은 합친 뒤 전체 합계 / 전체 개수로 다시 계산
+# (지점별 평균을 다시 평균내면 기록 수가 많은 지점과 적은 지점이 같은 비중이 되므로 사용하지 않음)
+
+def merge_membership_stats(parts):
+    return parts.groupby('membership_type', as_index=False)['count'].sum() \
+        .sort_values('count', ascending=False).reset_index(drop=True)
+
+def merge_monthly_workouts(parts):
+    merged = parts.groupby('month_key', as_index=False)[['workout_count', 'total_calories', 'calorie_count']].sum()
+    merged['avg_calories'] = merged['total_calories'] / merged['calorie_count'].replace(0, np.nan)
+    return merged.sort_values('month_key').reset_index(drop=True)
+
+def merge_trainer_ratings(parts):
+    merged = parts.groupby('specialty', as_index=False)[['trainer_count', 'rating_sum', 'rating_count']].sum()
+    merged['avg_rating'] = merged['rating_sum'] / merged['rating_count'].replace(0, np.nan)
+    return merged.sort_values('avg_rating', ascending=False).reset_index(drop=True)
+
+# 이름: (지점별 부분 집계 쿼리, 합치는 함수)
+FEDERATED_QUERIES = {
+    'membership_stats': ('''
+        SELECT membership_type, COUNT(*) as count
+        FROM members
+        WHERE status = 'active'
+        GROUP BY membership_type
+    ''', merge_membership_stats),
+    'monthly_workouts': ('''
+        SELECT month_key,
+               COUNT(*) as workout_count,
+               SUM(calories_burned) as total_calories,
+               COUNT(calories_burned) as calorie_count
+        FROM workout_records
+        WHERE month_key IS NOT NULL
+        GROUP BY month_key
+    ''', merge_monthly_workouts),
+    'trainer_ratings': ('''
+        SELECT specialty,
+               COUNT(*) as trainer_count,
+               SUM(rating) as rating_sum,
+               COUNT(rating) as rating_count
+        FROM trainers
+        WHERE status = 'active'
+        GROUP BY specialty
+    ''', merge_trainer_ratings),
+}
+
+# 지점 x 쿼리 조합을 하나의 스레드 풀에 한꺼번에 제출해 병렬 실행
+# 작업자 스레드마다 지점별 읽기 연결을 유지하고, 스냅샷 파일이 교체되면 다시 연결
+class FederatedQueryExecutor:
+    def __init__(self, max_workers=8):
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="federated-query")
+
+    def _connection(self, snapshot_path):
+        file_id = os.stat(snapshot_path).st_ino
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        conn, conn_file_id = connections.get(snapshot_path, (None, None))
+        if conn is None or conn_file_id != file_id:
+            if conn is not None:
+                conn.close()
+            conn = connect_snapshot(snapshot_path)
+            connections[snapshot_path] = (conn, file_id)
+
+        return conn
+
+    def _run(self, snapshot_path, sql):
+        return pd.read_sql(sql, self._connection(snapshot_path))
+
+    # branches: {지점명: 스냅샷 경로}
+    # 반환값: ({이름: (통합 결과, 지점별 부분 집계)}, {실패한 지점명: 오류 메시지})
+    # 한 쿼리라도 실패한 지점은 모든 통합 결과에서 제외 (결과끼리 같은 지점 집합을 기준으로 맞춤)
+    def run(self, branches, names=None):
+        names = list(names or FEDERATED_QUERIES)
+
+        futures = {}
+        for branch, snapshot_path in branches.items():
+            for name in names:
+                future = self._pool.submit(self._run, snapshot_path, FEDERATED_QUERIES[name][0])
+                futures[future] = (branch, name)
+
+        parts = {name: [] for name in names}
+        errors = {}
+        for future in as_completed(futures):
+            branch, name = futures[future]
+            try:
+                part = future.result()
+            except (sqlite3.Error, pd.errors.DatabaseError, OSError) as e:
+                errors.setdefault(branch, str(e))
+                continue
+            part.insert(0, 'branch', branch)
+            parts[name].append((branch, part))
+
+        results = {}
+        for name in names:
+            branch_parts = [part for branch, part in parts[name] if branch not in errors]
+            by_branch = pd.concat(branch_parts, ignore_index=True) if branch_parts else pd.DataFrame()
+            merged = FEDERATED_QUERIES[name][1](by_branch) if not by_branch.empty else by_branch
+            results[name] = (merged, by_branch)
+
+        return results, errors
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
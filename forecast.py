@@ -0,0 +1,196 @@
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from date_encoding import to_epoch_day
+
+logger = logging.getLogger(__name__)
+
+# 최근 수업에 더 큰 가중치 (반감기, 일)
+HALF_LIFE_DAYS = 56
+# 권장 정원 = 예상 수요 + 1.28 x 표준편차 (약 90% 수요를 수용)
+CAPACITY_Z = 1.28
+MIN_CAPACITY = 1
+MAX_CAPACITY = 30
+# 지난 수업이 이보다 적으면 예측을 쓰지 않고 기본 정원 사용
+MIN_SAMPLES = 4
+DEFAULT_CAPACITY = 10
+# 권장 정원 하한 = 지난 수업 정원(가중 평균) x 비율 (조용했던 몇 회 때문에 정원이 급격히 줄지 않도록)
+CAPACITY_FLOOR_RATIO = 0.5
+# 요일 구분 없이 수업명/시간대로만 집계한 예측 행의 weekday 값
+ANY_WEEKDAY = -1
+
+# 수업 수요 예측 테이블 생성
+def create_forecast_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS class_demand_forecast (
+            class_name TEXT NOT NULL,
+            time_slot INTEGER NOT NULL,
+            weekday INTEGER NOT NULL,
+            predicted_bookings REAL,
+            predicted_fill REAL,
+            recommended_capacity INTEGER,
+            samples INTEGER,
+            updated_at TEXT,
+            PRIMARY KEY (class_name, time_slot, weekday)
+        )
+    ''')
+
+# 지난 수업별 수요 (확정 예약 + 남은 대기자) 조회
+def load_class_history(conn, today_day):
+    classes = pd.read_sql('''
+        SELECT id, class_name, CAST(substr(time, 1, 2) AS INTEGER) as time_slot,
+               (date_day + 4) % 7 as weekday, date_day, max_capacity
+        FROM classes
+        WHERE date_day < ?
+    ''', conn, params=[today_day])
+
+    bookings = pd.read_sql('''
+        SELECT class_id as id, COUNT(*) as booked
+        FROM bookings
+        WHERE status = 'confirmed'
+        GROUP BY class_id
+    ''', conn)
+
+    waitlist = pd.read_sql('''
+        SELECT class_id as id, COUNT(*) as waiting
+        FROM waitlist
+        GROUP BY class_id
+    ''', conn)
+
+    history = classes.merge(bookings, on='id', how='left').merge(waitlist, on='id', how='left')
+    # 예약/대기 이력이 없으면 병합 결과가 object 열이 되므로 float 로 바꾼 뒤 0 으로 채움
+    history[['booked', 'waiting']] = history[['booked', 'waiting']].astype(float).fillna(0)
+    history['demand'] = history['booked'] + history['waiting']
+    history['max_capacity'] = history['max_capacity'].astype(float)
+    return history
+
+# 가중 평균/분산으로 그룹별 예측값 계산 (모든 그룹을 한 번에 groupby 로 처리)
+def fit_demand(history, today_day, keys):
+    age = (today_day - history['date_day']).clip(lower=0)
+    frame = history[keys].copy()
+    frame['w'] = np.power(0.5, age / HALF_LIFE_DAYS)
+    frame['wd'] = frame['w'] * history['demand']
+    frame['wd2'] = frame['w'] * history['demand'] ** 2
+    frame['wf'] = frame['w'] * history['demand'] / history['max_capacity'].clip(lower=1)
+    frame['wc'] = frame['w'] * history['max_capacity']
+    frame['samples'] = 1
+
+    grouped = frame.groupby(keys, as_index=False)[['w', 'wd', 'wd2', 'wf', 'wc', 'samples']].sum()
+    mean = grouped['wd'] / grouped['w']
+    variance = (grouped['wd2'] / grouped['w'] - mean ** 2).clip(lower=0)
+
+    grouped['predicted_bookings'] = mean
+    grouped['predicted_fill'] = grouped['wf'] / grouped['w']
+    floor = np.floor(grouped['wc'] / grouped['w'] * CAPACITY_FLOOR_RATIO)
+    grouped['recommended_capacity'] = np.maximum(np.ceil(mean + CAPACITY_Z * np.sqrt(variance)), floor) \
+        .clip(MIN_CAPACITY, MAX_CAPACITY).astype(int)
+    return grouped
+
+# 수요 예측 재계산 후 테이블 교체
+def run_forecast(db_path='gym_management.db', today=None):
+    start = time.perf_counter()
+    today_day = to_epoch_day(today or datetime.now())
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    create_forecast_table(cursor)
+
+    history = load_class_history(conn, today_day)
+    rows = []
+    if not history.empty:
+        exact = fit_demand(history, today_day, ['class_name', 'time_slot', 'weekday'])
+        any_weekday = fit_demand(history, today_day, ['class_name', 'time_slot'])
+        any_weekday['weekday'] = ANY_WEEKDAY
+
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for frame in (exact, any_weekday):
+            rows.extend(zip(frame['class_name'], frame['time_slot'].astype(int), frame['weekday'].astype(int),
+                            frame['predicted_bookings'].astype(float), frame['predicted_fill'].astype(float),
+                            frame['recommended_capacity'].astype(int), frame['samples'].astype(int),
+                            [updated_at] * len(frame)))
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("DELETE FROM class_demand_forecast")
+        cursor.executemany('''
+            INSERT INTO class_demand_forecast
+            (class_name, time_slot, weekday, predicted_bookings, predicted_fill,
+             recommended_capacity, samples, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logger.info("수업 수요 예측 갱신: 지난 수업 %d개, 예측 %d건 (%.3fs)",
+                len(history), len(rows), time.perf_counter() - start)
+    return len(rows)
+
+# 수업명/시간대/요일 예측 조회 (요일별 예측의 표본이 min_samples 보다 적으면 요일 무관 예측 사용)
+# 반환값: (예상 예약 인원, 예상 충원율, 권장 정원, 표본 수) 또는 None (둘 다 표본이 부족한 경우 포함)
+def lookup_forecast(conn, class_name, time_slot, weekday, min_samples=MIN_SAMPLES):
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT predicted_bookings, predicted_fill, recommended_capacity, samples
+            FROM class_demand_forecast
+            WHERE class_name = ? AND time_slot = ? AND weekday IN (?, ?) AND samples >= ?
+            ORDER BY weekday DESC
+            LIMIT 1
+        ''', (class_name, time_slot, weekday, ANY_WEEKDAY, min_samples))
+    except sqlite3.OperationalError:
+        # 아직 예측 테이블이 없음
+        return None
+    return cursor.fetchone()
+
+# 마지막 예측 갱신 시각
+def last_forecast_time(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MAX(updated_at) FROM class_demand_forecast")
+    except sqlite3.OperationalError:
+        return None
+    return cursor.fetchone()[0]
+
+# 매일 밤 run_at_hour 시 이후 하루 한 번 예측 갱신 (예측이 없으면 즉시 실행)
+def start_forecaster(db_path='gym_management.db', run_at_hour=3, check_interval=600):
+    def run():
+        while True:
+            try:
+                conn = sqlite3.connect(db_path)
+                last_run = last_forecast_time(conn)
+                conn.close()
+
+                now = datetime.now()
+                due = last_run is None or (last_run[:10] < now.strftime('%Y-%m-%d') and now.hour >= run_at_hour)
+                if due:
+                    run_forecast(db_path)
+            except sqlite3.Error:
+                logger.exception("수업 수요 예측 실패")
+            time.sleep(check_interval)
+
+    thread = threading.Thread(target=run, name="demand-forecaster", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="수업 수요 예측 (야간 배치)")
+    parser.add_argument("--db", default="gym_management.db")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    count = run_forecast(args.db)
+    print(f"예측 {count}건 저장")
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,48 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import random
 import hashlib
+import os
+from concurrent.futures import as_completed
+
+from booking import create_waitlist_table, book_class, cancel_booking, leave_waitlist
+from reconciler import create_booking_count_index, start_reconciler, get_last_report
+from snapshot import ensure_snapshot, start_snapshotter, connect_snapshot, snapshot_version
+from query_batch import QueryBatchExecutor
+from change_detector import create_change_tracking, ChangeDetector
+from change_log import create_change_log
+from profiling import SamplingProfiler
+from personal_records import create_personal_records, get_personal_records
+from training_load import create_training_load_index, flag_members
+from date_encoding import migrate_date_columns, to_epoch_day, format_month_key, TODAY_DAY_SQL
+from forecast import create_forecast_table, start_forecaster, lookup_forecast, DEFAULT_CAPACITY, MIN_SAMPLES
+from branches import load_branches
+from federation import FederatedQueryExecutor
+from maintenance import start_maintenance, get_last_maintenance_report
+
+# 변경 감지 후 화면 자동 갱신 주기 (초)
+AUTO_REFRESH_SECONDS = 5
+ANALYTICS_REFRESH_SECONDS = 30
+
+# 대시보드 훈련 부하 알림에 상태별로 보여줄 최대 회원 수
+TRAINING_LOAD_DISPLAY_LIMIT = 20
+
+# 회원 목록에 보여줄 컬럼 (SELECT * 는 start_day/end_day 같은 정수 날짜 생성 컬럼까지 가져오므로 사용하지 않음)
+MEMBER_LIST_COLUMNS = "id, name, email, phone, membership_type, start_date, end_date, status"
+
+# 지점 설정 (지점마다 운영 DB 와 분석용 스냅샷을 따로 사용)
+BRANCHES = load_branches()
 
 # 데이터베이스 초기화
-def init_database():
-    conn = sqlite3.connect('gym_management.db')
+def init_database(db_path='gym_management.db'):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    # 증분 vacuum: 새 파일에만 바로 적용됨 (기존 파일은 점검 작업이 전환)
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    
+    # WAL 모드: 분석용 읽기가 예약/운동 기록 쓰기를 막지 않도록 설정
+    cursor.execute("PRAGMA journal_mode=WAL")
+    
     # 회원 테이블
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS members (
@@ -82,12 +118,36 @@ def init_database():
         )
     ''')
     
+    # 날짜 컬럼을 정수 일 수로 저장하는 생성 컬럼과 인덱스
+    migrate_date_columns(cursor)
+    
+    # 대기자 명단 테이블
+    create_waitlist_table(cursor)
+    
+    # 개인 기록 테이블 (운동 기록 추가/삭제 시 트리거로 갱신)
+    create_personal_records(cursor)
+    
+    # 훈련 부하 계산용 기간 인덱스
+    create_training_load_index(cursor)
+    
+    # 수업 수요 예측 테이블 (야간 배치로 갱신)
+    create_forecast_table(cursor)
+    
+    # 수업별 예약 집계 인덱스
+    create_booking_count_index(cursor)
+    
+    # 테이블별 변경 카운터 (화면 자동 갱신용)
+    create_change_tracking(cursor)
+    
+    # 추가 전용 변경 이력 (증분 내보내기/외부 집계용)
+    create_change_log(cursor)
+    
     conn.commit()
     conn.close()
 
 # 샘플 데이터 삽입
-def insert_sample_data():
-    conn = sqlite3.connect('gym_management.db')
+def insert_sample_data(db_path='gym_management.db'):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # 기존 데이터 확인
@@ -161,8 +221,8 @@ def insert_sample_data():
     conn.close()
 
 # 회원권 만료 알림
-def check_membership_expiry():
-    conn = sqlite3.connect('gym_management.db')
+def check_membership_expiry(db_path='gym_management.db'):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     today = datetime.now().date()
@@ -171,9 +231,9 @@ def check_membership_expiry():
     cursor.execute('''
         SELECT name, email, end_date 
         FROM members 
-        WHERE end_date <= ? AND status = 'active'
-        ORDER BY end_date
-    ''', (warning_date,))
+        WHERE end_day <= ? AND status = 'active'
+        ORDER BY end_day
+    ''', (to_epoch_day(warning_date),))
     
     expiring_members = cursor.fetchall()
     conn.close()
@@ -181,44 +241,117 @@ def check_membership_expiry():
     return expiring_members
 
 # 운동 계획 추천
-def recommend_workout_plan(member_id):
-    conn = sqlite3.connect('gym_management.db')
-    cursor = conn.cursor()
+def recommend_workout_plan(member_id, db_path='gym_management.db'):
+    conn = sqlite3.connect(db_path)
     
-    # 최근 운동 기록 분석
-    cursor.execute('''
-        SELECT exercise_name, AVG(weight) as avg_weight, COUNT(*) as frequency
-        FROM workout_records 
-        WHERE member_id = ? AND date >= ?
-        GROUP BY exercise_name
-        ORDER BY frequency DESC
-    ''', (member_id, (datetime.now() - timedelta(days=30)).date()))
-    
-    recent_exercises = cursor.fetchall()
+    # 개인 기록 조회 (운동 기록 전체를 다시 집계하지 않음)
+    personal_records = get_personal_records(conn, member_id)
     conn.close()
     
     recommendations = []
     
-    if not recent_exercises:
+    if not personal_records:
         recommendations = [
             "초보자 추천: 기본 스쿼트 3세트 10회",
             "초보자 추천: 푸쉬업 3세트 8회",
             "초보자 추천: 런닝머신 20분"
         ]
     else:
-        for exercise, avg_weight, freq in recent_exercises[:3]:
-            new_weight = avg_weight * 1.05 if avg_weight else 0
-            recommendations.append(f"{exercise}: {int(new_weight)}kg 3세트 8-10회")
+        for exercise, max_weight, best_e1rm, best_volume, sessions, last_date in personal_records[:3]:
+            # 추정 1RM 에서 9회 반복 가능한 무게를 역산 (Epley 공식)
+            new_weight = best_e1rm / (1 + 9 / 30) if best_e1rm else 0
+            recommendations.append(f"{exercise}: {int(new_weight)}kg 3세트 8-10회 (추정 1RM {int(best_e1rm or 0)}kg)")
     
     return recommendations
 
+# 지점 DB 준비 (지점마다 프로세스당 한 번만 실행, 이후 실행과 폼 제출에서는 건너뜀)
+@st.cache_resource
+def prepare_branch(db_path, snapshot_path):
+    init_database(db_path)
+    insert_sample_data(db_path)
+    start_background_jobs(db_path, snapshot_path)
+
+# 백그라운드 작업 시작
+def start_background_jobs(db_path, snapshot_path):
+    # classes.current_bookings 정합성 검사 (5분 간격)
+    start_reconciler(db_path, interval=300)
+    
+    # 분석용 읽기 전용 스냅샷 (1분 간격)
+    ensure_snapshot(db_path, snapshot_path)
+    start_snapshotter(db_path, snapshot_path, interval=60)
+    
+    # 수업 수요 예측 (매일 새벽 3시)
+    start_forecaster(db_path, run_at_hour=3)
+    
+    # DB 점검: 통계 갱신, 증분 vacuum, 체크포인트, 무결성 검사 (매일 새벽 4~6시)
+    start_maintenance(db_path, start_hour=4, end_hour=6)
+
+# 현재 선택된 지점
+def current_branch():
+    branch = st.session_state.get('branch')
+    return branch if branch in BRANCHES else next(iter(BRANCHES))
+
+# 현재 지점의 운영 DB 경로
+def current_db():
+    return BRANCHES[current_branch()]['db']
+
+# 현재 지점의 분석용 스냅샷 경로
+def current_snapshot():
+    return BRANCHES[current_branch()]['snapshot']
+
 # Streamlit 앱 메인
 def main():
     st.set_page_config(page_title="뼈는 남기고 살만 빼줄께", page_icon="🦴", layout="wide")
     
-    # 데이터베이스 초기화
-    init_database()
-    insert_sample_data()
+    # 지점 선택 (지점이 여러 개일 때만 표시)
+    if len(BRANCHES) > 1:
+        st.sidebar.selectbox("🏢 지점", list(BRANCHES), key='branch')
+    
+    # 프로파일링 모드: ?profile=1 또는 사이드바 관리자 토글
+    profiling = st.sidebar.toggle("🔬 프로파일링 (관리자)", value=st.query_params.get("profile") == "1",
+                                  key="profiling_toggle")
+    
+    if profiling:
+        report_area = st.container()
+        with SamplingProfiler() as profiler:
+            render_app()
+        with report_area:
+            show_profile_report(profiler)
+    else:
+        render_app()
+
+# 이번 실행의 프로파일 결과 표시 및 저장
+def show_profile_report(profiler):
+    speedscope_path, folded_path = profiler.save('profiles')
+    
+    with st.expander(f"🔬 프로파일 결과 (전체 {profiler.elapsed * 1000:.0f}ms, 샘플 {len(profiler.samples)}개)", expanded=True):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write("**화면 구역별 시간**")
+            sections_df = pd.DataFrame(profiler.section_times(), columns=['section', 'seconds'])
+            sections_df['ms'] = sections_df['seconds'] * 1000
+            st.dataframe(sections_df[['section', 'ms']], use_container_width=True)
+        
+        with col2:
+            st.write("**구간별 시간 (SQL / pandas / Plotly / Streamlit / 앱 코드)**")
+            categories_df = pd.DataFrame(profiler.category_times(), columns=['category', 'seconds'])
+            categories_df['ms'] = categories_df['seconds'] * 1000
+            st.dataframe(categories_df[['category', 'ms']], use_container_width=True)
+        
+        st.write("**함수별 자체 시간 TOP 20**")
+        st.dataframe(pd.DataFrame(profiler.top_functions(20)), use_container_width=True)
+        
+        st.caption(f"저장됨: {speedscope_path} (speedscope.app 에서 열기), {folded_path}")
+        with open(speedscope_path, 'rb') as f:
+            st.download_button("⬇️ speedscope 파일 다운로드", f, file_name=os.path.basename(speedscope_path),
+                               mime="application/json")
+
+# 화면 그리기 (프로파일링 대상 구간)
+def render_app():
+    # 데이터베이스 초기화 (통합 분석을 위해 모든 지점의 스냅샷을 유지)
+    for branch in BRANCHES.values():
+        prepare_branch(branch['db'], branch['snapshot'])
     
     # 헤더 및 로고
     col1, col2 = st.columns([1, 4])
@@ -235,7 +368,7 @@ def main():
         st.markdown("""
         <div style='padding: 20px;'>
             <h1 style='color: #2c3e50; margin-bottom: 10px; font-size: 2.5em;'>🦴 뼈는 남기고 살만 빼줄께</h1>
-            <h3 style='color: #7f8c8d; margin-top: 0;'>💪 회원 관리 시스템</h3>
+            <h3 style='color: #7f8c8d; margin-top: 0;'>💪 회원 관리 시스템 · 🏢 """ + current_branch() + """</h3>
             <p style='color: #95a5a6; font-style: italic;'>"건강한 뼈, 탄탄한 근육, 완벽한 몸매를 만들어드립니다!"</p>
         </div>
         """, unsafe_allow_html=True)
@@ -261,47 +394,139 @@ def main():
     with tab5:
         show_trainer_management()
     with tab6:
+        if len(BRANCHES) > 1:
+            show_chain_analytics()
         show_analytics()
 
+# 변경 감지 서비스 (지점마다 프로세스 전체에서 감시 연결 하나를 공유)
+@st.cache_resource
+def get_change_detector(db_path):
+    return ChangeDetector(db_path)
+
+# 결과 캐시: token(테이블/스냅샷 버전)이 그대로면 세션에 저장된 결과를 재사용하고 쿼리를 건너뜀
+def cached_query(key, token, fn):
+    cache = st.session_state.setdefault('query_cache', {})
+    hit = cache.get(key)
+    if hit is None or hit[0] != token:
+        hit = (token, fn())
+        cache[key] = hit
+    
+    result = hit[1]
+    return result.copy() if isinstance(result, pd.DataFrame) else result
+
+# 운영 DB 조회 (tables 중 하나라도 바뀌었을 때만 실행)
+def read_sql_cached(sql, tables, params=None):
+    db_path = current_db()
+    
+    def run():
+        conn = sqlite3.connect(db_path)
+        try:
+            return pd.read_sql(sql, conn, params=params)
+        finally:
+            conn.close()
+    
+    token = get_change_detector(db_path).token(tables)
+    return cached_query(('main', db_path, sql, tuple(params or ())), token, run)
+
+# 선택 상자 라벨 {id: 라벨} (조회 결과와 같은 token 으로 캐시해 결과가 바뀔 때만 한 번 만듦)
+# format_func=labels.get 으로 넘기면 옵션마다 DataFrame 을 다시 거르지 않음
+def read_labels_cached(sql, tables, template, params=None):
+    db_path = current_db()
+    
+    def run():
+        df = read_sql_cached(sql, tables, params)
+        return {row['id']: template.format(**row) for row in df.to_dict('records')}
+    
+    token = get_change_detector(db_path).token(tables)
+    return cached_query(('labels', db_path, sql, tuple(params or ()), template), token, run)
+
+# 분석용 스냅샷 조회 (스냅샷 파일이 교체됐을 때만 실행)
+def read_snapshot_cached(sql, params=None):
+    snapshot_path = current_snapshot()
+    
+    def run():
+        conn = connect_snapshot(snapshot_path)
+        try:
+            return pd.read_sql(sql, conn, params=params)
+        finally:
+            conn.close()
+    
+    return cached_query(('snapshot', snapshot_path, sql, tuple(params or ())), snapshot_version(snapshot_path), run)
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
 def show_dashboard():
     st.header("📊 대시보드")
     
-    # 새로고침 버튼
-    col_refresh, col_space = st.columns([1, 5])
-    with col_refresh:
-        if st.button("🔄 새로고침", key="dashboard_refresh"):
-            st.rerun()
-    
-    conn = sqlite3.connect('gym_management.db')
+    # 주요 지표는 분석용 스냅샷에서 조회
+    snapshot_meta = read_snapshot_cached("SELECT taken_at FROM snapshot_meta")
+    st.caption(f"📸 기준 시각: {snapshot_meta['taken_at'].iloc[0] if not snapshot_meta.empty else None}")
     
     # 주요 지표
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_members = pd.read_sql("SELECT COUNT(*) as count FROM members WHERE status='active'", conn)['count'][0]
+        total_members = read_snapshot_cached("SELECT COUNT(*) as count FROM members WHERE status='active'")['count'][0]
         st.metric("활성 회원 수", total_members)
     
     with col2:
-        total_trainers = pd.read_sql("SELECT COUNT(*) as count FROM trainers WHERE status='active'", conn)['count'][0]
+        total_trainers = read_snapshot_cached("SELECT COUNT(*) as count FROM trainers WHERE status='active'")['count'][0]
         st.metric("트레이너 수", total_trainers)
     
     with col3:
-        today_workouts = pd.read_sql(
-            "SELECT COUNT(*) as count FROM workout_records WHERE date = ?", 
-            conn, params=[datetime.now().date()]
+        today_workouts = read_snapshot_cached(
+            "SELECT COUNT(*) as count FROM workout_records WHERE date_day = ?", 
+            params=[to_epoch_day(datetime.now())]
         )['count'][0]
         st.metric("오늘 운동 기록", today_workouts)
     
     with col4:
-        upcoming_classes = pd.read_sql(
-            "SELECT COUNT(*) as count FROM classes WHERE date >= ?", 
-            conn, params=[datetime.now().date()]
+        upcoming_classes = read_snapshot_cached(
+            "SELECT COUNT(*) as count FROM classes WHERE date_day >= ?", 
+            params=[to_epoch_day(datetime.now())]
         )['count'][0]
         st.metric("예정된 수업", upcoming_classes)
     
+    # 예약 수 정합성 검사 결과
+    reconcile_report = get_last_report(current_db())
+    if reconcile_report:
+        st.caption(f"🧮 예약 수 정합성 검사 ({reconcile_report['finished_at'].strftime('%H:%M:%S')}): "
+                   f"{reconcile_report['checked']}개 수업 중 {reconcile_report['drifted']}개 보정")
+    
+    # 마지막 DB 점검 결과
+    maintenance_report = get_last_maintenance_report(current_db())
+    if maintenance_report:
+        check_ok = all(step.get('ok', True) for step in maintenance_report['steps'])
+        st.caption(f"🧹 DB 점검 ({maintenance_report['finished_at'].strftime('%m-%d %H:%M')}): "
+                   f"{maintenance_report['reclaimed_bytes'] / 1024:.0f}KB 반환, "
+                   f"{maintenance_report['elapsed']:.1f}초, 무결성 {'정상' if check_ok else '⛔ 오류'}")
+    
+    # 훈련 부하 알림 (급성 7일 : 만성 28일 부하 비율)
+    st.subheader("🚦 훈련 부하 알림")
+    flagged_df = cached_query(('training_load', current_snapshot(), datetime.now().date()),
+                              snapshot_version(current_snapshot()),
+                              lambda: load_training_load_flags(current_snapshot()))
+    
+    if not flagged_df.empty:
+        # 회원이 많으면 경고 대상도 많으므로 상태별 인원만 요약하고 상위 회원만 표시
+        status_counts = flagged_df['status'].value_counts()
+        st.caption(" · ".join(f"{status} {count:,}명" for status, count in status_counts.items()))
+        
+        # 과훈련은 ACWR 높은 순, 훈련 감소는 낮은 순으로 상위 회원만
+        overtraining = flagged_df[flagged_df['status'] == '⚠️ 과훈련 위험'].head(TRAINING_LOAD_DISPLAY_LIMIT)
+        detraining = flagged_df[flagged_df['status'] == '📉 훈련 감소'].tail(TRAINING_LOAD_DISPLAY_LIMIT).iloc[::-1]
+        display_df = pd.concat([overtraining, detraining], ignore_index=True)
+        
+        # 인덱스를 1부터 시작하도록 설정
+        display_df.index = display_df.index + 1
+        st.dataframe(display_df, use_container_width=True)
+    else:
+        st.success("훈련 부하 경고 대상 회원이 없습니다.")
+    
     # 회원권 만료 알림
     st.subheader("⚠️ 회원권 만료 알림")
-    expiring_members = check_membership_expiry()
+    expiring_members = cached_query(('expiring_members', current_db(), datetime.now().date()),
+                                    get_change_detector(current_db()).token(['members']),
+                                    lambda: check_membership_expiry(current_db()))
     
     if expiring_members:
         for name, email, end_date in expiring_members:
@@ -312,523 +537,721 @@ def show_dashboard():
                 st.warning(f"⚠️ {name} ({email}) - {days_left}일 후 만료")
     else:
         st.success("만료 예정 회원권이 없습니다.")
-    
-    conn.close()
+
+# 과훈련/훈련 감소 회원 조회 (분석용 스냅샷에서 전 회원을 한 번에 계산)
+def load_training_load_flags(snapshot_path):
+    conn = connect_snapshot(snapshot_path)
+    try:
+        flagged = flag_members(conn, datetime.now().date())
+        flagged_df = pd.DataFrame(flagged, columns=['member_id', 'acute_load', 'chronic_load', 'acwr', 'status'])
+        
+        if not flagged_df.empty:
+            # 경고 대상이 많아도 SQL 변수 개수 제한에 걸리지 않도록 이름은 회원 목록과 병합
+            names_df = pd.read_sql("SELECT id as member_id, name FROM members", conn)
+            flagged_df = names_df.merge(flagged_df, on='member_id')
+            flagged_df['status'] = flagged_df['status'].map({'overtraining': '⚠️ 과훈련 위험', 'detraining': '📉 훈련 감소'})
+            flagged_df = flagged_df.sort_values('acwr', ascending=False).reset_index(drop=True)
+        
+        return flagged_df
+    finally:
+        conn.close()
 
 def show_member_management():
     st.header("👥 회원 관리")
     
-    # 새로고침 버튼
-    col_refresh, col_space = st.columns([1, 5])
-    with col_refresh:
-        if st.button("🔄 새로고침", key="member_refresh"):
-            st.rerun()
-    
     tab1, tab2, tab3 = st.tabs(["회원 목록", "회원 등록", "회원 삭제"])
     
     with tab1:
-        conn = sqlite3.connect('gym_management.db')
-        members_df = pd.read_sql("SELECT * FROM members", conn)
-        conn.close()
-        
-        # 인덱스를 1부터 시작하도록 설정
-        members_df.index = members_df.index + 1
-        st.dataframe(members_df, use_container_width=True)
+        show_member_list()
     
     with tab2:
-        st.subheader("새 회원 등록")
-        
-        with st.form("member_registration"):
-            name = st.text_input("이름")
-            email = st.text_input("이메일")
-            phone = st.text_input("전화번호")
-            membership_type = st.selectbox("회원권 종류", ["일반", "프리미엄", "VIP"], key="member_registration_membership_type")
-            start_date = st.date_input("시작일")
-            
-            # 회원권 기간 설정
-            if membership_type == "일반":
-                duration = 180  # 6개월
-            elif membership_type == "프리미엄":
-                duration = 365  # 1년
-            else:  # VIP
-                duration = 730  # 2년
-            
-            end_date = start_date + timedelta(days=duration)
-            st.write(f"만료일: {end_date}")
-            
-            submitted = st.form_submit_button("등록")
-            
-            if submitted and name and email:
-                conn = sqlite3.connect('gym_management.db')
-                cursor = conn.cursor()
-                
-                try:
-                    cursor.execute('''
-                        INSERT INTO members (name, email, phone, membership_type, start_date, end_date)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (name, email, phone, membership_type, start_date, end_date))
-                    conn.commit()
-                    st.success("회원이 성공적으로 등록되었습니다!")
-                    st.info("🔄 새로고침 버튼을 눌러 목록을 업데이트하세요.")
-                except sqlite3.IntegrityError:
-                    st.error("이미 등록된 이메일입니다.")
-                
-                conn.close()
+        show_member_registration()
     
     with tab3:
-        st.subheader("🗑️ 회원 삭제")
+        show_member_delete()
+
+# 회원 등록 폼 (제출 시 이 구역만 다시 실행)
+@st.fragment
+def show_member_registration():
+    st.subheader("새 회원 등록")
+    
+    with st.form("member_registration"):
+        name = st.text_input("이름")
+        email = st.text_input("이메일")
+        phone = st.text_input("전화번호")
+        membership_type = st.selectbox("회원권 종류", ["일반", "프리미엄", "VIP"], key="member_registration_membership_type")
+        start_date = st.date_input("시작일")
         
-        conn = sqlite3.connect('gym_management.db')
+        # 회원권 기간 설정
+        if membership_type == "일반":
+            duration = 180  # 6개월
+        elif membership_type == "프리미엄":
+            duration = 365  # 1년
+        else:  # VIP
+            duration = 730  # 2년
         
-        # 회원 목록 조회
-        members_df = pd.read_sql("SELECT * FROM members WHERE status='active'", conn)
+        end_date = start_date + timedelta(days=duration)
+        st.write(f"만료일: {end_date}")
         
-        if not members_df.empty:
-            # 인덱스를 1부터 시작하도록 설정
-            members_df.index = members_df.index + 1
-            st.dataframe(members_df, use_container_width=True)
-            
-            # 삭제할 회원 선택
-            member_id = st.selectbox("삭제할 회원 선택", options=members_df['id'].tolist(),
-                                   format_func=lambda x: f"{members_df[members_df['id']==x]['name'].iloc[0]} ({members_df[members_df['id']==x]['email'].iloc[0]})", 
-                                   key="member_delete_select")
+        submitted = st.form_submit_button("등록")
+        
+        if submitted and name and email:
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
             
-            if st.button("회원 삭제", type="secondary"):
-                cursor = conn.cursor()
-                
-                # 회원 상태를 'inactive'로 변경 (완전 삭제 대신)
-                cursor.execute("UPDATE members SET status = 'inactive' WHERE id = ?", (member_id,))
-                
+            try:
+                cursor.execute('''
+                    INSERT INTO members (name, email, phone, membership_type, start_date, end_date)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, email, phone, membership_type, start_date, end_date))
                 conn.commit()
-                st.success("회원이 비활성화되었습니다!")
-                st.info("🔄 새로고침 버튼을 눌러 목록을 업데이트하세요.")
-        else:
-            st.info("삭제할 회원이 없습니다.")
-        
-        conn.close()
+                st.success("회원이 성공적으로 등록되었습니다!")
+            except sqlite3.IntegrityError:
+                st.error("이미 등록된 이메일입니다.")
+            
+            conn.close()
 
-def show_workout_records():
-    st.header("🏃‍♂️ 운동 기록")
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_member_list():
+    members_df = read_sql_cached(f"SELECT {MEMBER_LIST_COLUMNS} FROM members", ['members'])
     
-    # 새로고침 버튼
-    col_refresh, col_space = st.columns([1, 5])
-    with col_refresh:
-        if st.button("🔄 새로고침", key="workout_refresh"):
-            st.rerun()
+    # 인덱스를 1부터 시작하도록 설정
+    members_df.index = members_df.index + 1
+    st.dataframe(members_df, use_container_width=True)
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_member_delete():
+    st.subheader("🗑️ 회원 삭제")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["운동 기록 조회", "운동 기록 추가", "개인 운동 계획", "운동 기록 삭제"])
+    # 회원 목록 조회
+    members_sql = f"SELECT {MEMBER_LIST_COLUMNS} FROM members WHERE status='active'"
+    members_df = read_sql_cached(members_sql, ['members'])
     
-    with tab1:
-        conn = sqlite3.connect('gym_management.db')
-        
-        # 회원 선택
-        members_df = pd.read_sql("SELECT id, name FROM members WHERE status='active'", conn)
-        member_options = {f"{row['name']} (ID: {row['id']})": row['id'] for _, row in members_df.iterrows()}
+    if not members_df.empty:
+        # 인덱스를 1부터 시작하도록 설정
+        members_df.index = members_df.index + 1
+        st.dataframe(members_df, use_container_width=True)
         
-        selected_member = st.selectbox("회원 선택", options=list(member_options.keys()), key="workout_records_member_select")
+        # 삭제할 회원 선택
+        member_labels = read_labels_cached(members_sql, ['members'], "{name} ({email})")
+        member_id = st.selectbox("삭제할 회원 선택", options=members_df['id'].tolist(),
+                               format_func=member_labels.get, 
+                               key="member_delete_select")
         
-        if selected_member:
-            member_id = member_options[selected_member]
+        if st.button("회원 삭제", type="secondary"):
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
             
-            # 운동 기록 조회
-            workout_df = pd.read_sql('''
-                SELECT exercise_name, sets, reps, weight, duration, calories_burned, date
-                FROM workout_records 
-                WHERE member_id = ?
-                ORDER BY date DESC
-            ''', conn, params=[member_id])
+            # 회원 상태를 'inactive'로 변경 (완전 삭제 대신)
+            cursor.execute("UPDATE members SET status = 'inactive' WHERE id = ?", (member_id,))
             
-            if not workout_df.empty:
-                # 인덱스를 1부터 시작하도록 설정
-                workout_df.index = workout_df.index + 1
-                st.dataframe(workout_df, use_container_width=True)
-                
-                # 운동 효과 시각화
-                st.subheader("📈 운동 효과 분석")
-                
-                # 칼로리 소모 추이
-                daily_calories = workout_df.groupby('date')['calories_burned'].sum().reset_index()
-                fig_calories = px.line(daily_calories, x='date', y='calories_burned', 
-                                     title='일별 칼로리 소모량')
-                st.plotly_chart(fig_calories, use_container_width=True)
-                
-                # 운동별 빈도
-                exercise_freq = workout_df['exercise_name'].value_counts()
-                fig_freq = px.pie(values=exercise_freq.values, names=exercise_freq.index, 
-                                title='운동별 빈도')
-                st.plotly_chart(fig_freq, use_container_width=True)
-            else:
-                st.info("운동 기록이 없습니다.")
-        
-        conn.close()
+            conn.commit()
+            conn.close()
+            st.success("회원이 비활성화되었습니다!")
+    else:
+        st.info("삭제할 회원이 없습니다.")
+
+def show_workout_records():
+    st.header("🏃‍♂️ 운동 기록")
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["운동 기록 조회", "운동 기록 추가", "개인 운동 계획", "운동 기록 삭제"])
+    
+    with tab1:
+        show_workout_history()
     
     with tab2:
-        st.subheader("운동 기록 추가")
-        
-        conn = sqlite3.connect('gym_management.db')
-        members_df = pd.read_sql("SELECT id, name FROM members WHERE status='active'", conn)
-        conn.close()
-        
-        with st.form("workout_record"):
-            member_id = st.selectbox("회원", options=members_df['id'].tolist(), 
-                                   format_func=lambda x: members_df[members_df['id']==x]['name'].iloc[0], key="workout_record_member_select")
-            exercise_name = st.selectbox("운동", 
-                                       ["벤치프레스", "스쿼트", "데드리프트", "풀업", "푸쉬업", "런닝머신", "사이클"], key="workout_record_exercise_select")
-            sets = st.number_input("세트", min_value=1, max_value=10, value=3)
-            reps = st.number_input("횟수", min_value=1, max_value=50, value=10)
-            weight = st.number_input("무게(kg)", min_value=0.0, value=20.0)
-            duration = st.number_input("시간(분)", min_value=1, value=30)
-            calories_burned = st.number_input("소모 칼로리", min_value=0, value=200)
-            date = st.date_input("날짜", value=datetime.now().date())
-            
-            submitted = st.form_submit_button("기록 추가")
-            
-            if submitted:
-                conn = sqlite3.connect('gym_management.db')
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO workout_records 
-                    (member_id, exercise_name, sets, reps, weight, duration, calories_burned, date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (member_id, exercise_name, sets, reps, weight, duration, calories_burned, date))
-                
-                conn.commit()
-                conn.close()
-                st.success("운동 기록이 추가되었습니다!")
-                st.info("🔄 새로고침 버튼을 눌러 기록을 확인하세요.")
+        show_workout_record_form()
     
     with tab3:
-        st.subheader("🎯 개인 맞춤 운동 계획")
-        
-        conn = sqlite3.connect('gym_management.db')
-        members_df = pd.read_sql("SELECT id, name FROM members WHERE status='active'", conn)
-        conn.close()
+        show_workout_plan()
+    
+    with tab4:
+        show_workout_delete()
+
+# 운동 기록 추가 폼 (제출 시 이 구역만 다시 실행)
+# 다른 화면/세션에서 등록한 회원도 선택할 수 있도록 주기적으로 다시 실행 (회원 목록은 변경 시에만 다시 조회)
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_workout_record_form():
+    st.subheader("운동 기록 추가")
+    
+    members_df = read_sql_cached("SELECT id, name FROM members WHERE status='active'", ['members'])
+    member_labels = read_labels_cached("SELECT id, name FROM members WHERE status='active'", ['members'], "{name}")
+    
+    with st.form("workout_record"):
+        member_id = st.selectbox("회원", options=members_df['id'].tolist(), 
+                               format_func=member_labels.get, key="workout_record_member_select")
+        exercise_name = st.selectbox("운동", 
+                                   ["벤치프레스", "스쿼트", "데드리프트", "풀업", "푸쉬업", "런닝머신", "사이클"], key="workout_record_exercise_select")
+        sets = st.number_input("세트", min_value=1, max_value=10, value=3)
+        reps = st.number_input("횟수", min_value=1, max_value=50, value=10)
+        weight = st.number_input("무게(kg)", min_value=0.0, value=20.0)
+        duration = st.number_input("시간(분)", min_value=1, value=30)
+        calories_burned = st.number_input("소모 칼로리", min_value=0, value=200)
+        date = st.date_input("날짜", value=datetime.now().date())
         
-        member_id = st.selectbox("회원 선택", options=members_df['id'].tolist(), 
-                               format_func=lambda x: members_df[members_df['id']==x]['name'].iloc[0], key="workout_plan_member_select")
+        submitted = st.form_submit_button("기록 추가")
         
-        if st.button("운동 계획 생성"):
-            recommendations = recommend_workout_plan(member_id)
+        if submitted:
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
             
-            st.write("### 추천 운동 계획:")
-            for i, rec in enumerate(recommendations, 1):
-                st.write(f"{i}. {rec}")
+            cursor.execute('''
+                INSERT INTO workout_records 
+                (member_id, exercise_name, sets, reps, weight, duration, calories_burned, date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (member_id, exercise_name, sets, reps, weight, duration, calories_burned, date))
+            
+            conn.commit()
+            conn.close()
+            st.success("운동 기록이 추가되었습니다!")
+
+# 개인 운동 계획 (버튼을 눌러도 이 구역만 다시 실행)
+# 회원 목록을 최신으로 유지하기 위해 주기적으로 다시 실행하므로 생성한 계획은 세션에 보관
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_workout_plan():
+    st.subheader("🎯 개인 맞춤 운동 계획")
+    
+    members_df = read_sql_cached("SELECT id, name FROM members WHERE status='active'", ['members'])
+    member_labels = read_labels_cached("SELECT id, name FROM members WHERE status='active'", ['members'], "{name}")
+    
+    member_id = st.selectbox("회원 선택", options=members_df['id'].tolist(), 
+                           format_func=member_labels.get, key="workout_plan_member_select")
+    
+    if st.button("운동 계획 생성"):
+        st.session_state['workout_plan'] = (current_db(), member_id,
+                                            recommend_workout_plan(member_id, current_db()))
+    
+    # 선택한 회원의 계획만 표시 (다른 회원/지점을 고르면 숨김)
+    plan = st.session_state.get('workout_plan')
+    if plan and plan[:2] == (current_db(), member_id):
+        st.write("### 추천 운동 계획:")
+        for i, rec in enumerate(plan[2], 1):
+            st.write(f"{i}. {rec}")
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_workout_history():
+    # 회원 선택
+    members_df = read_sql_cached("SELECT id, name FROM members WHERE status='active'", ['members'])
+    member_options = {f"{row['name']} (ID: {row['id']})": row['id'] for _, row in members_df.iterrows()}
     
-    with tab4:
-        st.subheader("🗑️ 운동 기록 삭제")
-        
-        conn = sqlite3.connect('gym_management.db')
+    selected_member = st.selectbox("회원 선택", options=list(member_options.keys()), key="workout_records_member_select")
+    
+    if selected_member:
+        member_id = member_options[selected_member]
         
-        # 운동 기록 목록 조회
-        workout_records_df = pd.read_sql('''
-            SELECT wr.id, m.name as member_name, wr.exercise_name, wr.sets, wr.reps, 
-                   wr.weight, wr.duration, wr.calories_burned, wr.date
-            FROM workout_records wr
-            JOIN members m ON wr.member_id = m.id
-            ORDER BY wr.date DESC
-        ''', conn)
+        # 운동 기록 조회
+        workout_df = read_sql_cached('''
+            SELECT exercise_name, sets, reps, weight, duration, calories_burned, date
+            FROM workout_records 
+            WHERE member_id = ?
+            ORDER BY date DESC
+        ''', ['workout_records'], params=[member_id])
         
-        if not workout_records_df.empty:
+        if not workout_df.empty:
             # 인덱스를 1부터 시작하도록 설정
-            workout_records_df.index = workout_records_df.index + 1
-            st.dataframe(workout_records_df, use_container_width=True)
+            workout_df.index = workout_df.index + 1
+            st.dataframe(workout_df, use_container_width=True)
             
-            # 삭제할 기록 선택
-            record_id = st.selectbox("삭제할 운동 기록 선택", options=workout_records_df['id'].tolist(),
-                                   format_func=lambda x: f"{workout_records_df[workout_records_df['id']==x]['member_name'].iloc[0]} - {workout_records_df[workout_records_df['id']==x]['exercise_name'].iloc[0]} ({workout_records_df[workout_records_df['id']==x]['date'].iloc[0]})", 
-                                   key="workout_record_delete_select")
+            # 개인 기록 (운동 기록 추가/삭제 시 갱신되는 테이블에서 바로 조회)
+            st.subheader("🏅 개인 기록")
+            records_df = read_sql_cached('''
+                SELECT exercise_name, max_weight, best_e1rm, best_volume, sessions, last_date
+                FROM personal_records
+                WHERE member_id = ?
+                ORDER BY best_e1rm DESC
+            ''', ['workout_records'], params=[member_id])
             
-            if st.button("운동 기록 삭제", type="secondary"):
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM workout_records WHERE id = ?", (record_id,))
-                conn.commit()
-                st.success("운동 기록이 삭제되었습니다!")
-                st.info("🔄 새로고침 버튼을 눌러 목록을 업데이트하세요.")
+            if not records_df.empty:
+                records_df.index = records_df.index + 1
+                st.dataframe(records_df, use_container_width=True)
+                
+                fig_records = px.bar(records_df, x='exercise_name', y=['max_weight', 'best_e1rm'],
+                                   barmode='group', title='운동별 최대 무게 / 추정 1RM')
+                fig_records.update_layout(xaxis_title='운동', yaxis_title='무게(kg)')
+                st.plotly_chart(fig_records, use_container_width=True)
+            
+            # 운동 효과 시각화
+            st.subheader("📈 운동 효과 분석")
+            
+            # 칼로리 소모 추이
+            daily_calories = workout_df.groupby('date')['calories_burned'].sum().reset_index()
+            fig_calories = px.line(daily_calories, x='date', y='calories_burned', 
+                                 title='일별 칼로리 소모량')
+            st.plotly_chart(fig_calories, use_container_width=True)
+            
+            # 운동별 빈도
+            exercise_freq = workout_df['exercise_name'].value_counts()
+            fig_freq = px.pie(values=exercise_freq.values, names=exercise_freq.index, 
+                            title='운동별 빈도')
+            st.plotly_chart(fig_freq, use_container_width=True)
         else:
-            st.info("삭제할 운동 기록이 없습니다.")
+            st.info("운동 기록이 없습니다.")
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_workout_delete():
+    st.subheader("🗑️ 운동 기록 삭제")
+    
+    # 운동 기록 목록 조회
+    workout_records_sql = '''
+        SELECT wr.id, m.name as member_name, wr.exercise_name, wr.sets, wr.reps, 
+               wr.weight, wr.duration, wr.calories_burned, wr.date
+        FROM workout_records wr
+        JOIN members m ON wr.member_id = m.id
+        ORDER BY wr.date DESC
+    '''
+    workout_records_df = read_sql_cached(workout_records_sql, ['workout_records', 'members'])
+    
+    if not workout_records_df.empty:
+        # 인덱스를 1부터 시작하도록 설정
+        workout_records_df.index = workout_records_df.index + 1
+        st.dataframe(workout_records_df, use_container_width=True)
         
-        conn.close()
+        # 삭제할 기록 선택
+        record_labels = read_labels_cached(workout_records_sql, ['workout_records', 'members'],
+                                           "{member_name} - {exercise_name} ({date})")
+        record_id = st.selectbox("삭제할 운동 기록 선택", options=workout_records_df['id'].tolist(),
+                               format_func=record_labels.get, 
+                               key="workout_record_delete_select")
+        
+        if st.button("운동 기록 삭제", type="secondary"):
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM workout_records WHERE id = ?", (record_id,))
+            conn.commit()
+            conn.close()
+            st.success("운동 기록이 삭제되었습니다!")
+    else:
+        st.info("삭제할 운동 기록이 없습니다.")
 
 def show_class_booking():
     st.header("📅 수업 예약 관리")
     
-    # 새로고침 버튼
-    col_refresh, col_space = st.columns([1, 5])
-    with col_refresh:
-        if st.button("🔄 새로고침", key="class_refresh"):
-            st.rerun()
-    
-    tab1, tab2, tab3 = st.tabs(["수업 예약", "수업 관리", "수업 삭제"])
+    tab1, tab2, tab3, tab4 = st.tabs(["수업 예약", "예약 취소", "수업 관리", "수업 삭제"])
     
     with tab1:
-        st.subheader("수업 예약")
-        
-        conn = sqlite3.connect('gym_management.db')
-        
-        # 예약 가능한 수업 조회
-        classes_df = pd.read_sql('''
-            SELECT c.id, c.class_name, t.name as trainer_name, c.date, c.time, 
-                   c.duration, c.max_capacity, c.current_bookings,
-                   (c.max_capacity - c.current_bookings) as available_spots
-            FROM classes c
-            JOIN trainers t ON c.trainer_id = t.id
-            WHERE c.date >= date('now')
-            ORDER BY c.date, c.time
-        ''', conn)
-        
-        if not classes_df.empty:
-            # 인덱스를 1부터 시작하도록 설정
-            classes_df.index = classes_df.index + 1
-            st.dataframe(classes_df, use_container_width=True)
-            
-            # 예약하기
-            class_id = st.selectbox("수업 선택", options=classes_df['id'].tolist(),
-                                  format_func=lambda x: f"{classes_df[classes_df['id']==x]['class_name'].iloc[0]} - {classes_df[classes_df['id']==x]['date'].iloc[0]} {classes_df[classes_df['id']==x]['time'].iloc[0]}", key="class_booking_class_select")
-            
-            members_df = pd.read_sql("SELECT id, name FROM members WHERE status='active'", conn)
-            member_id = st.selectbox("회원 선택", options=members_df['id'].tolist(),
-                                   format_func=lambda x: members_df[members_df['id']==x]['name'].iloc[0], key="class_booking_member_select")
-            
-            if st.button("예약하기"):
-                cursor = conn.cursor()
-                
-                # 예약 가능 여부 확인
-                cursor.execute("SELECT max_capacity, current_bookings FROM classes WHERE id = ?", (class_id,))
-                capacity, current = cursor.fetchone()
-                
-                if current < capacity:
-                    cursor.execute('''
-                        INSERT INTO bookings (member_id, class_id, booking_date)
-                        VALUES (?, ?, ?)
-                    ''', (member_id, class_id, datetime.now().date()))
-                    
-                    cursor.execute('''
-                        UPDATE classes SET current_bookings = current_bookings + 1 WHERE id = ?
-                    ''', (class_id,))
-                    
-                    conn.commit()
-                    st.success("예약이 완료되었습니다!")
-                    st.info("🔄 새로고침 버튼을 눌러 예약 현황을 확인하세요.")
-                else:
-                    st.error("수업이 만석입니다.")
-        else:
-            st.info("예약 가능한 수업이 없습니다.")
-        
-        conn.close()
+        show_class_reservation()
     
     with tab2:
-        st.subheader("수업 관리")
+        show_booking_cancellation()
+    
+    with tab3:
+        show_class_form()
+    
+    with tab4:
+        show_class_delete()
+
+# 수업 추가 폼 (수업명/시간 입력과 제출 모두 이 구역만 다시 실행)
+# 새로 등록한 트레이너도 선택할 수 있도록 주기적으로 다시 실행 (트레이너 목록은 변경 시에만 다시 조회)
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_class_form():
+    st.subheader("수업 관리")
+    
+    st.write("새 수업 추가")
+    
+    # 수업명/날짜/시간은 폼 밖에서 입력해 바로 수요 예측을 보여줌
+    class_name = st.text_input("수업명", key="add_class_name")
+    date = st.date_input("날짜", key="add_class_date")
+    time = st.time_input("시간", key="add_class_time")
+    
+    # 야간 배치로 계산해 둔 예측 테이블에서 기본 키로 바로 조회
+    recommended_capacity = DEFAULT_CAPACITY
+    if class_name:
+        conn = sqlite3.connect(current_db())
+        prediction = lookup_forecast(conn, class_name, time.hour, (to_epoch_day(date) + 4) % 7)
+        conn.close()
+        
+        if prediction:
+            predicted_bookings, predicted_fill, recommended_capacity, samples = prediction
+            st.info(f"📈 예상 예약 인원 {predicted_bookings:.1f}명 (과거 충원율 {predicted_fill:.0%}, 지난 수업 {samples}회 기준) "
+                    f"→ 권장 정원 {recommended_capacity}명")
+        else:
+            st.caption(f"이 수업명/시간대의 지난 수업이 {MIN_SAMPLES}회 미만이라 예측 없이 기본 정원 {DEFAULT_CAPACITY}명을 사용합니다.")
+    
+    with st.form("add_class"):
+        trainers_df = read_sql_cached("SELECT id, name, specialty FROM trainers WHERE status='active'", ['trainers'])
+        trainer_labels = read_labels_cached("SELECT id, name, specialty FROM trainers WHERE status='active'", ['trainers'],
+                                            "{name} ({specialty})")
+        
+        trainer_id = st.selectbox("트레이너", options=trainers_df['id'].tolist(),
+                                format_func=trainer_labels.get, key="class_management_trainer_select")
+        duration = st.number_input("시간(분)", min_value=30, max_value=180, value=60)
+        max_capacity = st.number_input("최대 인원", min_value=1, max_value=30, value=int(recommended_capacity))
         
-        with st.form("add_class"):
-            st.write("새 수업 추가")
+        submitted = st.form_submit_button("수업 추가")
+        
+        if submitted and class_name:
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO classes (class_name, trainer_id, date, time, duration, max_capacity)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (class_name, trainer_id, date, time.strftime('%H:%M'), duration, max_capacity))
             
-            conn = sqlite3.connect('gym_management.db')
-            trainers_df = pd.read_sql("SELECT id, name, specialty FROM trainers WHERE status='active'", conn)
+            conn.commit()
+            conn.close()
+            st.success("수업이 추가되었습니다!")
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_class_reservation():
+    st.subheader("수업 예약")
+    
+    # 예약 가능한 수업 조회
+    classes_sql = '''
+        SELECT c.id, c.class_name, t.name as trainer_name, c.date, c.time, 
+               c.duration, c.max_capacity, c.current_bookings,
+               (c.max_capacity - c.current_bookings) as available_spots
+        FROM classes c
+        JOIN trainers t ON c.trainer_id = t.id
+        WHERE c.date_day >= ?
+        ORDER BY c.date_day, c.time
+    '''
+    classes_params = [to_epoch_day(datetime.now())]
+    classes_df = read_sql_cached(classes_sql, ['classes', 'trainers'], params=classes_params)
+    
+    if not classes_df.empty:
+        # 인덱스를 1부터 시작하도록 설정
+        classes_df.index = classes_df.index + 1
+        st.dataframe(classes_df, use_container_width=True)
+        
+        # 예약하기
+        class_labels = read_labels_cached(classes_sql, ['classes', 'trainers'], "{class_name} - {date} {time}",
+                                          params=classes_params)
+        class_id = st.selectbox("수업 선택", options=classes_df['id'].tolist(),
+                              format_func=class_labels.get, key="class_booking_class_select")
+        
+        members_df = read_sql_cached("SELECT id, name FROM members WHERE status='active'", ['members'])
+        member_labels = read_labels_cached("SELECT id, name FROM members WHERE status='active'", ['members'], "{name}")
+        member_id = st.selectbox("회원 선택", options=members_df['id'].tolist(),
+                               format_func=member_labels.get, key="class_booking_member_select")
+        
+        if st.button("예약하기"):
+            # 예약 가능 여부 확인 (만석이면 대기자 명단에 등록)
+            conn = sqlite3.connect(current_db())
+            status, rank = book_class(conn, class_id, member_id)
             conn.close()
             
-            class_name = st.text_input("수업명")
-            trainer_id = st.selectbox("트레이너", options=trainers_df['id'].tolist(),
-                                    format_func=lambda x: f"{trainers_df[trainers_df['id']==x]['name'].iloc[0]} ({trainers_df[trainers_df['id']==x]['specialty'].iloc[0]})", key="class_management_trainer_select")
-            date = st.date_input("날짜")
-            time = st.time_input("시간")
-            duration = st.number_input("시간(분)", min_value=30, max_value=180, value=60)
-            max_capacity = st.number_input("최대 인원", min_value=1, max_value=30, value=10)
+            if status == 'confirmed':
+                st.success("예약이 완료되었습니다!")
+            elif status == 'waitlisted':
+                st.warning(f"수업이 만석입니다. 대기자 명단에 등록되었습니다. (대기 {rank}번)")
+            elif status == 'duplicate':
+                st.error("이미 이 수업을 예약했거나 대기 중인 회원입니다.")
+            else:
+                st.error("수업을 찾을 수 없습니다.")
+    else:
+        st.info("예약 가능한 수업이 없습니다.")
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_booking_cancellation():
+    st.subheader("❌ 예약 취소")
+    
+    # 예정된 수업의 확정 예약 조회
+    bookings_sql = '''
+        SELECT b.id, m.name as member_name, c.class_name, c.date, c.time, b.booking_date
+        FROM bookings b
+        JOIN members m ON b.member_id = m.id
+        JOIN classes c ON b.class_id = c.id
+        WHERE b.status = 'confirmed' AND c.date_day >= ?
+        ORDER BY c.date_day, c.time
+    '''
+    upcoming_params = [to_epoch_day(datetime.now())]
+    bookings_df = read_sql_cached(bookings_sql, ['bookings', 'members', 'classes'], params=upcoming_params)
+    
+    if not bookings_df.empty:
+        # 인덱스를 1부터 시작하도록 설정
+        bookings_df.index = bookings_df.index + 1
+        st.dataframe(bookings_df, use_container_width=True)
+        
+        # 취소할 예약 선택
+        booking_labels = read_labels_cached(bookings_sql, ['bookings', 'members', 'classes'],
+                                            "{member_name} - {class_name} ({date} {time})", params=upcoming_params)
+        booking_id = st.selectbox("취소할 예약 선택", options=bookings_df['id'].tolist(),
+                                format_func=booking_labels.get, 
+                                key="booking_cancel_select")
+        
+        if st.button("예약 취소", type="secondary"):
+            conn = sqlite3.connect(current_db())
+            cancelled, promoted_member_id = cancel_booking(conn, booking_id)
             
-            submitted = st.form_submit_button("수업 추가")
+            if cancelled:
+                st.success("예약이 취소되었습니다!")
+                if promoted_member_id:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT name FROM members WHERE id = ?", (promoted_member_id,))
+                    promoted = cursor.fetchone()
+                    st.info(f"⬆️ 대기자 {promoted[0] if promoted else promoted_member_id} 님의 예약이 확정되었습니다.")
+            else:
+                st.error("이미 취소된 예약입니다.")
             
-            if submitted and class_name:
-                conn = sqlite3.connect('gym_management.db')
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO classes (class_name, trainer_id, date, time, duration, max_capacity)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (class_name, trainer_id, date, time.strftime('%H:%M'), duration, max_capacity))
-                
-                conn.commit()
-                conn.close()
-                st.success("수업이 추가되었습니다!")
-                st.info("🔄 새로고침 버튼을 눌러 수업 목록을 확인하세요.")
-    
-    with tab3:
-        st.subheader("🗑️ 수업 삭제")
+            conn.close()
+    else:
+        st.info("취소할 예약이 없습니다.")
+    
+    # 대기자 명단
+    st.subheader("⏳ 대기자 명단")
+    waitlist_sql = '''
+        SELECT w.id, c.class_name, c.date, c.time, m.name as member_name, w.created_at
+        FROM waitlist w
+        JOIN classes c ON w.class_id = c.id
+        JOIN members m ON w.member_id = m.id
+        WHERE c.date_day >= ?
+        ORDER BY w.class_id, w.position
+    '''
+    waitlist_df = read_sql_cached(waitlist_sql, ['waitlist', 'classes', 'members'], params=upcoming_params)
+    
+    if not waitlist_df.empty:
+        # 인덱스를 1부터 시작하도록 설정
+        waitlist_df.index = waitlist_df.index + 1
+        st.dataframe(waitlist_df, use_container_width=True)
         
-        conn = sqlite3.connect('gym_management.db')
+        waitlist_labels = read_labels_cached(waitlist_sql, ['waitlist', 'classes', 'members'],
+                                             "{member_name} - {class_name}", params=upcoming_params)
+        waitlist_id = st.selectbox("대기 취소할 회원 선택", options=waitlist_df['id'].tolist(),
+                                 format_func=waitlist_labels.get, 
+                                 key="waitlist_cancel_select")
         
-        # 수업 목록 조회
-        classes_df = pd.read_sql('''
-            SELECT c.id, c.class_name, t.name as trainer_name, c.date, c.time, 
-                   c.duration, c.max_capacity, c.current_bookings
-            FROM classes c
-            JOIN trainers t ON c.trainer_id = t.id
-            ORDER BY c.date DESC, c.time DESC
-        ''', conn)
+        if st.button("대기 취소", type="secondary"):
+            conn = sqlite3.connect(current_db())
+            if leave_waitlist(conn, waitlist_id):
+                st.success("대기가 취소되었습니다!")
+            conn.close()
+    else:
+        st.info("대기 중인 회원이 없습니다.")
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_class_delete():
+    st.subheader("🗑️ 수업 삭제")
+    
+    # 수업 목록 조회
+    classes_sql = '''
+        SELECT c.id, c.class_name, t.name as trainer_name, c.date, c.time, 
+               c.duration, c.max_capacity, c.current_bookings
+        FROM classes c
+        JOIN trainers t ON c.trainer_id = t.id
+        ORDER BY c.date DESC, c.time DESC
+    '''
+    classes_df = read_sql_cached(classes_sql, ['classes', 'trainers'])
+    
+    if not classes_df.empty:
+        # 인덱스를 1부터 시작하도록 설정
+        classes_df.index = classes_df.index + 1
+        st.dataframe(classes_df, use_container_width=True)
         
-        if not classes_df.empty:
-            # 인덱스를 1부터 시작하도록 설정
-            classes_df.index = classes_df.index + 1
-            st.dataframe(classes_df, use_container_width=True)
+        # 삭제할 수업 선택
+        class_labels = read_labels_cached(classes_sql, ['classes', 'trainers'],
+                                          "{class_name} - {trainer_name} ({date} {time})")
+        class_id = st.selectbox("삭제할 수업 선택", options=classes_df['id'].tolist(),
+                              format_func=class_labels.get, 
+                              key="class_delete_select")
+        
+        if st.button("수업 삭제", type="secondary"):
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
             
-            # 삭제할 수업 선택
-            class_id = st.selectbox("삭제할 수업 선택", options=classes_df['id'].tolist(),
-                                  format_func=lambda x: f"{classes_df[classes_df['id']==x]['class_name'].iloc[0]} - {classes_df[classes_df['id']==x]['trainer_name'].iloc[0]} ({classes_df[classes_df['id']==x]['date'].iloc[0]} {classes_df[classes_df['id']==x]['time'].iloc[0]})", 
-                                  key="class_delete_select")
+            # 관련 예약과 대기자 명단도 함께 삭제
+            cursor.execute("DELETE FROM bookings WHERE class_id = ?", (class_id,))
+            cursor.execute("DELETE FROM waitlist WHERE class_id = ?", (class_id,))
+            cursor.execute("DELETE FROM classes WHERE id = ?", (class_id,))
             
-            if st.button("수업 삭제", type="secondary"):
-                cursor = conn.cursor()
-                
-                # 관련 예약도 함께 삭제
-                cursor.execute("DELETE FROM bookings WHERE class_id = ?", (class_id,))
-                cursor.execute("DELETE FROM classes WHERE id = ?", (class_id,))
-                
-                conn.commit()
-                st.success("수업과 관련 예약이 삭제되었습니다!")
-                st.info("🔄 새로고침 버튼을 눌러 목록을 업데이트하세요.")
-        else:
-            st.info("삭제할 수업이 없습니다.")
-        
-        conn.close()
+            conn.commit()
+            conn.close()
+            st.success("수업과 관련 예약이 삭제되었습니다!")
+    else:
+        st.info("삭제할 수업이 없습니다.")
 
 def show_trainer_management():
     st.header("👨‍🏫 트레이너 관리")
     
-    # 새로고침 버튼
-    col_refresh, col_space = st.columns([1, 5])
-    with col_refresh:
-        if st.button("🔄 새로고침", key="trainer_refresh"):
-            st.rerun()
-    
     tab1, tab2, tab3 = st.tabs(["트레이너 목록", "트레이너 등록", "트레이너 삭제"])
     
     with tab1:
-        conn = sqlite3.connect('gym_management.db')
-        trainers_df = pd.read_sql("SELECT * FROM trainers", conn)
-        conn.close()
-        
-        # 인덱스를 1부터 시작하도록 설정
-        trainers_df.index = trainers_df.index + 1
-        st.dataframe(trainers_df, use_container_width=True)
+        show_trainer_list()
     
     with tab2:
-        st.subheader("새 트레이너 등록")
-        
-        with st.form("trainer_registration"):
-            name = st.text_input("이름")
-            specialty = st.selectbox("전문 분야", 
-                                   ["웨이트 트레이닝", "요가/필라테스", "크로스핏", "수영", "복싱", "댄스"], key="trainer_registration_specialty")
-            experience_years = st.number_input("경력(년)", min_value=0, max_value=30, value=1)
-            rating = st.slider("평점", 1.0, 5.0, 4.5, 0.1)
-            
-            submitted = st.form_submit_button("등록")
-            
-            if submitted and name:
-                conn = sqlite3.connect('gym_management.db')
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO trainers (name, specialty, experience_years, rating)
-                    VALUES (?, ?, ?, ?)
-                ''', (name, specialty, experience_years, rating))
-                
-                conn.commit()
-                conn.close()
-                st.success("트레이너가 등록되었습니다!")
-                st.info("🔄 새로고침 버튼을 눌러 목록을 업데이트하세요.")
+        show_trainer_registration()
     
     with tab3:
-        st.subheader("🗑️ 트레이너 삭제")
-        
-        conn = sqlite3.connect('gym_management.db')
+        show_trainer_delete()
+
+# 트레이너 등록 폼 (제출 시 이 구역만 다시 실행)
+@st.fragment
+def show_trainer_registration():
+    st.subheader("새 트레이너 등록")
+    
+    with st.form("trainer_registration"):
+        name = st.text_input("이름")
+        specialty = st.selectbox("전문 분야", 
+                               ["웨이트 트레이닝", "요가/필라테스", "크로스핏", "수영", "복싱", "댄스"], key="trainer_registration_specialty")
+        experience_years = st.number_input("경력(년)", min_value=0, max_value=30, value=1)
+        rating = st.slider("평점", 1.0, 5.0, 4.5, 0.1)
         
-        # 트레이너 목록 조회
-        trainers_df = pd.read_sql("SELECT * FROM trainers WHERE status='active'", conn)
+        submitted = st.form_submit_button("등록")
         
-        if not trainers_df.empty:
-            # 인덱스를 1부터 시작하도록 설정
-            trainers_df.index = trainers_df.index + 1
-            st.dataframe(trainers_df, use_container_width=True)
+        if submitted and name:
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
             
-            # 삭제할 트레이너 선택
-            trainer_id = st.selectbox("삭제할 트레이너 선택", options=trainers_df['id'].tolist(),
-                                    format_func=lambda x: f"{trainers_df[trainers_df['id']==x]['name'].iloc[0]} ({trainers_df[trainers_df['id']==x]['specialty'].iloc[0]})", 
-                                    key="trainer_delete_select")
+            cursor.execute('''
+                INSERT INTO trainers (name, specialty, experience_years, rating)
+                VALUES (?, ?, ?, ?)
+            ''', (name, specialty, experience_years, rating))
             
-            if st.button("트레이너 삭제", type="secondary"):
-                cursor = conn.cursor()
-                
-                # 트레이너 상태를 'inactive'로 변경 (완전 삭제 대신)
-                cursor.execute("UPDATE trainers SET status = 'inactive' WHERE id = ?", (trainer_id,))
-                
-                conn.commit()
-                st.success("트레이너가 비활성화되었습니다!")
-                st.info("🔄 새로고침 버튼을 눌러 목록을 업데이트하세요.")
-        else:
-            st.info("삭제할 트레이너가 없습니다.")
-        
-        conn.close()
+            conn.commit()
+            conn.close()
+            st.success("트레이너가 등록되었습니다!")
 
-def show_analytics():
-    st.header("📊 분석 리포트")
-    
-    # 새로고침 버튼
-    col_refresh, col_space = st.columns([1, 5])
-    with col_refresh:
-        if st.button("🔄 새로고침", key="analytics_refresh"):
-            st.rerun()
-    
-    conn = sqlite3.connect('gym_management.db')
-    
-    # 회원 현황 분석
-    col1, col2 = st.columns(2)
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_trainer_list():
+    trainers_df = read_sql_cached("SELECT * FROM trainers", ['trainers'])
     
-    with col1:
-        st.subheader("📋 회원권 유형별 분포")
-        membership_stats = pd.read_sql('''
-            SELECT membership_type, COUNT(*) as count
-            FROM members 
-            WHERE status = 'active'
-            GROUP BY membership_type
-        ''', conn)
-        
-        if not membership_stats.empty:
-            # 도넛 차트로 변경
-            fig_membership = px.pie(membership_stats, values='count', names='membership_type', 
-                                  title='회원권 유형별 분포', hole=0.4,
-                                  color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-            fig_membership.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_membership, use_container_width=True)
+    # 인덱스를 1부터 시작하도록 설정
+    trainers_df.index = trainers_df.index + 1
+    st.dataframe(trainers_df, use_container_width=True)
+
+@st.fragment(run_every=AUTO_REFRESH_SECONDS)
+def show_trainer_delete():
+    st.subheader("🗑️ 트레이너 삭제")
     
-    with col2:
-        st.subheader("⭐ 트레이너 평점 분포")
-        trainer_ratings = pd.read_sql('''
-            SELECT name, rating, specialty
-            FROM trainers 
-            WHERE status = 'active'
-            ORDER BY rating DESC
-        ''', conn)
-        
-        if not trainer_ratings.empty:
-            # 막대 차트
-            fig_ratings = px.bar(trainer_ratings, x='name', y='rating', 
-                               color='specialty', title='트레이너별 평점',
-                               color_discrete_sequence=['#FF9F43', '#10AC84', '#EE5A24', '#0ABDE3'])
-            fig_ratings.update_layout(xaxis_title='트레이너', yaxis_title='평점')
-            st.plotly_chart(fig_ratings, use_container_width=True)
+    # 트레이너 목록 조회
+    trainers_sql = "SELECT * FROM trainers WHERE status='active'"
+    trainers_df = read_sql_cached(trainers_sql, ['trainers'])
     
-    # 월별 운동 활동 분석
-    st.subheader("📈 월별 운동 활동 추이")
-    monthly_workouts = pd.read_sql('''
-        SELECT strftime('%Y-%m', date) as month, 
+    if not trainers_df.empty:
+        # 인덱스를 1부터 시작하도록 설정
+        trainers_df.index = trainers_df.index + 1
+        st.dataframe(trainers_df, use_container_width=True)
+        
+        # 삭제할 트레이너 선택
+        trainer_labels = read_labels_cached(trainers_sql, ['trainers'], "{name} ({specialty})")
+        trainer_id = st.selectbox("삭제할 트레이너 선택", options=trainers_df['id'].tolist(),
+                                format_func=trainer_labels.get, 
+                                key="trainer_delete_select")
+        
+        if st.button("트레이너 삭제", type="secondary"):
+            conn = sqlite3.connect(current_db())
+            cursor = conn.cursor()
+            
+            # 트레이너 상태를 'inactive'로 변경 (완전 삭제 대신)
+            cursor.execute("UPDATE trainers SET status = 'inactive' WHERE id = ?", (trainer_id,))
+            
+            conn.commit()
+            conn.close()
+            st.success("트레이너가 비활성화되었습니다!")
+    else:
+        st.info("삭제할 트레이너가 없습니다.")
+
+# 분석 리포트 쿼리 (서로 독립적이므로 병렬 실행)
+ANALYTICS_QUERIES = {
+    'membership_stats': '''
+        SELECT membership_type, COUNT(*) as count
+        FROM members 
+        WHERE status = 'active'
+        GROUP BY membership_type
+    ''',
+    'trainer_ratings': '''
+        SELECT name, rating, specialty
+        FROM trainers 
+        WHERE status = 'active'
+        ORDER BY rating DESC
+    ''',
+    'monthly_workouts': '''
+        SELECT month_key, 
                COUNT(*) as workout_count,
                AVG(calories_burned) as avg_calories,
                SUM(calories_burned) as total_calories
         FROM workout_records
-        GROUP BY month
-        ORDER BY month
-    ''', conn)
-    
+        WHERE month_key IS NOT NULL
+        GROUP BY month_key
+        ORDER BY month_key
+    ''',
+    'popular_exercises': '''
+        SELECT exercise_name, COUNT(*) as frequency,
+               AVG(weight) as avg_weight,
+               AVG(calories_burned) as avg_calories
+        FROM workout_records
+        GROUP BY exercise_name
+        ORDER BY frequency DESC
+        LIMIT 10
+    ''',
+    'calorie_by_exercise': '''
+        SELECT exercise_name, AVG(calories_burned) as avg_calories
+        FROM workout_records
+        GROUP BY exercise_name
+        ORDER BY avg_calories DESC
+        LIMIT 8
+    ''',
+    'trainer_classes': '''
+        SELECT t.name, t.specialty,
+               COUNT(c.id) as class_count, 
+               COALESCE(AVG(c.current_bookings), 0) as avg_bookings
+        FROM trainers t
+        LEFT JOIN classes c ON t.id = c.trainer_id
+        WHERE t.status = 'active'
+        GROUP BY t.id, t.name, t.specialty
+    ''',
+    'time_distribution': '''
+        SELECT 
+            CASE 
+                WHEN CAST(substr(time, 1, 2) AS INTEGER) < 9 THEN '새벽 (06-09)'
+                WHEN CAST(substr(time, 1, 2) AS INTEGER) < 12 THEN '오전 (09-12)'
+                WHEN CAST(substr(time, 1, 2) AS INTEGER) < 15 THEN '점심 (12-15)'
+                WHEN CAST(substr(time, 1, 2) AS INTEGER) < 18 THEN '오후 (15-18)'
+                ELSE '저녁 (18-22)'
+            END as time_slot,
+            COUNT(*) as class_count,
+            AVG(current_bookings) as avg_bookings
+        FROM classes
+        GROUP BY time_slot
+        ORDER BY avg_bookings DESC
+    ''',
+    'activity_heatmap': '''
+        SELECT 
+            CASE weekday
+                WHEN 0 THEN '일요일'
+                WHEN 1 THEN '월요일'
+                WHEN 2 THEN '화요일'
+                WHEN 3 THEN '수요일'
+                WHEN 4 THEN '목요일'
+                WHEN 5 THEN '금요일'
+                WHEN 6 THEN '토요일'
+            END as weekday,
+            month_week || '주차' as week,
+            COUNT(*) as workout_count
+        FROM workout_records
+        WHERE date_day >= ''' + TODAY_DAY_SQL + ''' - 30
+        GROUP BY weekday, month_week
+    ''',
+    'snapshot_meta': "SELECT taken_at FROM snapshot_meta",
+}
+
+# 분석 쿼리 실행기 (작업자 스레드마다 스냅샷 읽기 연결 하나)
+@st.cache_resource
+def get_analytics_executor(snapshot_path):
+    return QueryBatchExecutor(snapshot_path, max_workers=4)
+
+def render_membership_stats(membership_stats):
+    if not membership_stats.empty:
+        # 도넛 차트로 변경
+        fig_membership = px.pie(membership_stats, values='count', names='membership_type', 
+                              title='회원권 유형별 분포', hole=0.4,
+                              color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+        fig_membership.update_traces(textposition='inside', textinfo='percent+label')
+        st.plotly_chart(fig_membership, use_container_width=True)
+
+def render_trainer_ratings(trainer_ratings):
+    if not trainer_ratings.empty:
+        # 막대 차트
+        fig_ratings = px.bar(trainer_ratings, x='name', y='rating', 
+                           color='specialty', title='트레이너별 평점',
+                           color_discrete_sequence=['#FF9F43', '#10AC84', '#EE5A24', '#0ABDE3'])
+        fig_ratings.update_layout(xaxis_title='트레이너', yaxis_title='평점')
+        st.plotly_chart(fig_ratings, use_container_width=True)
+
+def render_monthly_workouts(monthly_workouts):
     if not monthly_workouts.empty:
+        monthly_workouts['month'] = monthly_workouts['month_key'].map(format_month_key)
+        
         # 복합 차트 (막대 + 선)
         fig_monthly = go.Figure()
         
@@ -859,160 +1282,239 @@ def show_analytics():
             hovermode='x unified'
         )
         st.plotly_chart(fig_monthly, use_container_width=True)
+
+def render_popular_exercises(popular_exercises):
+    if not popular_exercises.empty:
+        # 수평 막대 차트
+        fig_popular = px.bar(popular_exercises, 
+                           x='frequency', y='exercise_name',
+                           title='인기 운동 순위',
+                           orientation='h',
+                           color='frequency',
+                           color_continuous_scale='Viridis')
+        fig_popular.update_layout(yaxis={'categoryorder':'total ascending'})
+        st.plotly_chart(fig_popular, use_container_width=True)
+
+def render_calorie_by_exercise(calorie_by_exercise):
+    if not calorie_by_exercise.empty:
+        # 레이더 차트
+        fig_calories = go.Figure()
+        fig_calories.add_trace(go.Scatterpolar(
+            r=calorie_by_exercise['avg_calories'],
+            theta=calorie_by_exercise['exercise_name'],
+            fill='toself',
+            name='평균 칼로리',
+            line_color='#FF6B6B'
+        ))
+        fig_calories.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, calorie_by_exercise['avg_calories'].max()*1.1])
+            ),
+            title='운동별 평균 칼로리 소모량'
+        )
+        st.plotly_chart(fig_calories, use_container_width=True)
+
+def render_trainer_classes(trainer_classes):
+    if not trainer_classes.empty:
+        # 버블 차트
+        fig_trainers = px.scatter(trainer_classes, 
+                                x='class_count', y='avg_bookings',
+                                size='class_count', color='specialty',
+                                hover_name='name',
+                                title='트레이너별 수업 수 vs 평균 예약자 수',
+                                size_max=60)
+        fig_trainers.update_layout(
+            xaxis_title='수업 수',
+            yaxis_title='평균 예약자 수'
+        )
+        st.plotly_chart(fig_trainers, use_container_width=True)
+
+def render_time_distribution(time_distribution):
+    if not time_distribution.empty:
+        # 선버스트 차트 대신 간단한 파이 차트
+        fig_time = px.pie(time_distribution, 
+                        values='class_count', names='time_slot',
+                        title='시간대별 수업 분포',
+                        color_discrete_sequence=['#FF9F43', '#10AC84', '#EE5A24', '#0ABDE3', '#A55EEA'])
+        st.plotly_chart(fig_time, use_container_width=True)
+
+def render_activity_heatmap(activity_heatmap):
+    if not activity_heatmap.empty:
+        # 피벗 테이블 생성
+        heatmap_pivot = activity_heatmap.pivot(index='weekday', columns='week', values='workout_count').fillna(0)
+        
+        # 요일 순서 정렬
+        day_order = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일']
+        heatmap_pivot = heatmap_pivot.reindex(day_order)
+        
+        # 히트맵
+        fig_heatmap = px.imshow(heatmap_pivot.values,
+                              x=heatmap_pivot.columns,
+                              y=heatmap_pivot.index,
+                              color_continuous_scale='YlOrRd',
+                              title='요일별/주차별 운동 활동량')
+        fig_heatmap.update_xaxes(title='주차')
+        fig_heatmap.update_yaxes(title='요일')
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+
+def render_snapshot_meta(snapshot_meta):
+    taken_at = snapshot_meta['taken_at'].iloc[0] if not snapshot_meta.empty else None
+    st.caption(f"📸 기준 시각: {taken_at}")
+
+@st.fragment(run_every=ANALYTICS_REFRESH_SECONDS)
+def show_analytics():
+    st.header("📊 분석 리포트")
+    
+    # 차트 자리를 먼저 배치하고, 쿼리가 끝나는 순서대로 채움
+    slots = {}
+    slots['snapshot_meta'] = st.empty()
+    
+    # 회원 현황 분석
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📋 회원권 유형별 분포")
+        slots['membership_stats'] = st.empty()
+    
+    with col2:
+        st.subheader("⭐ 트레이너 평점 분포")
+        slots['trainer_ratings'] = st.empty()
+    
+    # 월별 운동 활동 분석
+    st.subheader("📈 월별 운동 활동 추이")
+    slots['monthly_workouts'] = st.empty()
     
     # 운동별 분석
     col3, col4 = st.columns(2)
     
     with col3:
         st.subheader("🏆 인기 운동 TOP 10")
-        popular_exercises = pd.read_sql('''
-            SELECT exercise_name, COUNT(*) as frequency,
-                   AVG(weight) as avg_weight,
-                   AVG(calories_burned) as avg_calories
-            FROM workout_records
-            GROUP BY exercise_name
-            ORDER BY frequency DESC
-            LIMIT 10
-        ''', conn)
-        
-        if not popular_exercises.empty:
-            # 수평 막대 차트
-            fig_popular = px.bar(popular_exercises, 
-                               x='frequency', y='exercise_name',
-                               title='인기 운동 순위',
-                               orientation='h',
-                               color='frequency',
-                               color_continuous_scale='Viridis')
-            fig_popular.update_layout(yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig_popular, use_container_width=True)
+        slots['popular_exercises'] = st.empty()
     
     with col4:
         st.subheader("🔥 운동별 평균 칼로리 소모")
-        calorie_by_exercise = pd.read_sql('''
-            SELECT exercise_name, AVG(calories_burned) as avg_calories
-            FROM workout_records
-            GROUP BY exercise_name
-            ORDER BY avg_calories DESC
-            LIMIT 8
-        ''', conn)
-        
-        if not calorie_by_exercise.empty:
-            # 레이더 차트
-            fig_calories = go.Figure()
-            fig_calories.add_trace(go.Scatterpolar(
-                r=calorie_by_exercise['avg_calories'],
-                theta=calorie_by_exercise['exercise_name'],
-                fill='toself',
-                name='평균 칼로리',
-                line_color='#FF6B6B'
-            ))
-            fig_calories.update_layout(
-                polar=dict(
-                    radialaxis=dict(visible=True, range=[0, calorie_by_exercise['avg_calories'].max()*1.1])
-                ),
-                title='운동별 평균 칼로리 소모량'
-            )
-            st.plotly_chart(fig_calories, use_container_width=True)
+        slots['calorie_by_exercise'] = st.empty()
     
     # 트레이너 및 수업 분석
     col5, col6 = st.columns(2)
     
     with col5:
         st.subheader("👨‍🏫 트레이너별 수업 현황")
-        trainer_classes = pd.read_sql('''
-            SELECT t.name, t.specialty,
-                   COUNT(c.id) as class_count, 
-                   COALESCE(AVG(c.current_bookings), 0) as avg_bookings
-            FROM trainers t
-            LEFT JOIN classes c ON t.id = c.trainer_id
-            WHERE t.status = 'active'
-            GROUP BY t.id, t.name, t.specialty
-        ''', conn)
-        
-        if not trainer_classes.empty:
-            # 버블 차트
-            fig_trainers = px.scatter(trainer_classes, 
-                                    x='class_count', y='avg_bookings',
-                                    size='class_count', color='specialty',
-                                    hover_name='name',
-                                    title='트레이너별 수업 수 vs 평균 예약자 수',
-                                    size_max=60)
-            fig_trainers.update_layout(
-                xaxis_title='수업 수',
-                yaxis_title='평균 예약자 수'
-            )
-            st.plotly_chart(fig_trainers, use_container_width=True)
+        slots['trainer_classes'] = st.empty()
     
     with col6:
         st.subheader("📅 시간대별 수업 현황")
-        time_distribution = pd.read_sql('''
-            SELECT 
-                CASE 
-                    WHEN CAST(substr(time, 1, 2) AS INTEGER) < 9 THEN '새벽 (06-09)'
-                    WHEN CAST(substr(time, 1, 2) AS INTEGER) < 12 THEN '오전 (09-12)'
-                    WHEN CAST(substr(time, 1, 2) AS INTEGER) < 15 THEN '점심 (12-15)'
-                    WHEN CAST(substr(time, 1, 2) AS INTEGER) < 18 THEN '오후 (15-18)'
-                    ELSE '저녁 (18-22)'
-                END as time_slot,
-                COUNT(*) as class_count,
-                AVG(current_bookings) as avg_bookings
-            FROM classes
-            GROUP BY time_slot
-            ORDER BY avg_bookings DESC
-        ''', conn)
-        
-        if not time_distribution.empty:
-            # 선버스트 차트 대신 간단한 파이 차트
-            fig_time = px.pie(time_distribution, 
-                            values='class_count', names='time_slot',
-                            title='시간대별 수업 분포',
-                            color_discrete_sequence=['#FF9F43', '#10AC84', '#EE5A24', '#0ABDE3', '#A55EEA'])
-            st.plotly_chart(fig_time, use_container_width=True)
+        slots['time_distribution'] = st.empty()
     
     # 회원 활동 히트맵
     st.subheader("🔥 요일별 운동 활동 히트맵")
-    activity_heatmap = pd.read_sql('''
-        SELECT 
-            CASE CAST(strftime('%w', date) AS INTEGER)
-                WHEN 0 THEN '일요일'
-                WHEN 1 THEN '월요일'
-                WHEN 2 THEN '화요일'
-                WHEN 3 THEN '수요일'
-                WHEN 4 THEN '목요일'
-                WHEN 5 THEN '금요일'
-                WHEN 6 THEN '토요일'
-            END as weekday,
-            CASE 
-                WHEN CAST(substr(date, 9, 2) AS INTEGER) <= 7 THEN '1주차'
-                WHEN CAST(substr(date, 9, 2) AS INTEGER) <= 14 THEN '2주차'
-                WHEN CAST(substr(date, 9, 2) AS INTEGER) <= 21 THEN '3주차'
-                ELSE '4주차'
-            END as week,
-            COUNT(*) as workout_count
-        FROM workout_records
-        WHERE date >= date('now', '-30 days')
-        GROUP BY weekday, week
-    ''', conn)
+    slots['activity_heatmap'] = st.empty()
+    
+    renderers = {
+        'snapshot_meta': render_snapshot_meta,
+        'membership_stats': render_membership_stats,
+        'trainer_ratings': render_trainer_ratings,
+        'monthly_workouts': render_monthly_workouts,
+        'popular_exercises': render_popular_exercises,
+        'calorie_by_exercise': render_calorie_by_exercise,
+        'trainer_classes': render_trainer_classes,
+        'time_distribution': render_time_distribution,
+        'activity_heatmap': render_activity_heatmap,
+    }
+    
+    # 스냅샷이 바뀌지 않았으면 쿼리 없이 이전 결과로 다시 그림
+    version = (current_snapshot(), snapshot_version(current_snapshot()))
+    cached = st.session_state.get('analytics_results')
+    if cached and cached[0] == version:
+        for name, result in cached[1].items():
+            with slots[name].container():
+                renderers[name](result)
+        return
     
-    if not activity_heatmap.empty:
-        # 피벗 테이블 생성
-        heatmap_pivot = activity_heatmap.pivot(index='weekday', columns='week', values='workout_count').fillna(0)
-        
-        # 요일 순서 정렬
-        day_order = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일']
-        heatmap_pivot = heatmap_pivot.reindex(day_order)
-        
-        # 히트맵
-        fig_heatmap = px.imshow(heatmap_pivot.values,
-                              x=heatmap_pivot.columns,
-                              y=heatmap_pivot.index,
-                              color_continuous_scale='YlOrRd',
-                              title='요일별/주차별 운동 활동량')
-        fig_heatmap.update_xaxes(title='주차')
-        fig_heatmap.update_yaxes(title='요일')
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+    for name, slot in slots.items():
+        slot.caption("⏳ 불러오는 중...")
+    
+    # 무거운 집계는 분석용 스냅샷에서 병렬로 조회 (운영 DB 쓰기와 경합하지 않음)
+    futures = get_analytics_executor(current_snapshot()).submit_batch(ANALYTICS_QUERIES)
+    
+    results = {}
+    names = {future: name for name, future in futures.items()}
+    for future in as_completed(names):
+        name = names[future]
+        with slots[name].container():
+            try:
+                results[name] = future.result()
+                renderers[name](results[name])
+            except (sqlite3.Error, pd.errors.DatabaseError) as e:
+                st.error(f"조회 실패: {e}")
+    
+    if len(results) == len(futures):
+        st.session_state['analytics_results'] = (version, results)
+
+# 전 지점 통합 쿼리 실행기 (지점 수가 늘어도 하나의 풀에서 지점 x 쿼리를 병렬 처리)
+@st.cache_resource
+def get_federated_executor():
+    return FederatedQueryExecutor(max_workers=8)
+
+@st.fragment(run_every=ANALYTICS_REFRESH_SECONDS)
+def show_chain_analytics():
+    st.header(f"🌐 전체 지점 통합 분석 ({len(BRANCHES)}개 지점)")
     
-    conn.close()
+    snapshots = {name: branch['snapshot'] for name, branch in BRANCHES.items()}
+    
+    # 모든 지점의 스냅샷이 그대로면 이전 통합 결과를 재사용
+    versions = tuple((name, snapshot_version(path)) for name, path in snapshots.items())
+    cached = st.session_state.get('chain_analytics_results')
+    if cached and cached[0] == versions:
+        results, errors = cached[1]
+    else:
+        results, errors = get_federated_executor().run(snapshots)
+        st.session_state['chain_analytics_results'] = (versions, (results, errors))
+    
+    for branch, error in errors.items():
+        st.warning(f"⚠️ {branch} 집계 실패 (통합 결과에서 제외): {error}")
+    
+    membership_stats, membership_by_branch = results['membership_stats']
+    monthly_workouts, monthly_by_branch = results['monthly_workouts']
+    trainer_ratings, trainer_by_branch = results['trainer_ratings']
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📋 전체 회원권 유형별 분포")
+        render_membership_stats(membership_stats)
+    
+    with col2:
+        st.subheader("🏢 지점별 활성 회원 수")
+        if not membership_by_branch.empty:
+            members_by_branch = membership_by_branch.groupby('branch', as_index=False)['count'].sum()
+            fig_branches = px.bar(members_by_branch, x='branch', y='count', color='branch',
+                                  title='지점별 활성 회원 수')
+            fig_branches.update_layout(xaxis_title='지점', yaxis_title='회원 수', showlegend=False)
+            st.plotly_chart(fig_branches, use_container_width=True)
+    
+    st.subheader("📈 전체 월별 운동 활동 추이")
+    render_monthly_workouts(monthly_workouts)
+    
+    st.subheader("⭐ 전문 분야별 평균 트레이너 평점")
+    if not trainer_ratings.empty:
+        fig_specialty = px.bar(trainer_ratings, x='specialty', y='avg_rating',
+                               hover_data=['trainer_count'], title='전문 분야별 평균 평점 (전 지점)',
+                               color_discrete_sequence=['#FF9F43'])
+        fig_specialty.update_layout(xaxis_title='전문 분야', yaxis_title='평균 평점')
+        st.plotly_chart(fig_specialty, use_container_width=True)
+    
+    # 지점별 비교표 (부분 집계를 지점 단위로 합산)
+    if not monthly_by_branch.empty and not trainer_by_branch.empty:
+        workouts = monthly_by_branch.groupby('branch')[['workout_count', 'total_calories', 'calorie_count']].sum()
+        trainers = trainer_by_branch.groupby('branch')[['trainer_count', 'rating_sum', 'rating_count']].sum()
+        comparison = workouts.join(trainers, how='outer')
+        comparison['avg_calories'] = comparison['total_calories'] / comparison['calorie_count']
+        comparison['avg_rating'] = comparison['rating_sum'] / comparison['rating_count']
+        st.dataframe(comparison[['workout_count', 'avg_calories', 'trainer_count', 'avg_rating']],
+                     use_container_width=True)
+    
+    st.divider()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
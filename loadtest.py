@@ -0,0 +1,268 @@
+import argparse
+import importlib.util
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from date_encoding import to_epoch_day
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gym-1.py')
+
+EXERCISES = ['벤치프레스', '스쿼트', '데드리프트', '풀업', '푸쉬업', '런닝머신', '사이클']
+CLASS_NAMES = ['아침 요가', '점심 크로스핏', '저녁 웨이트', '수영 강습', '필라테스', '복싱']
+
+# gym-1.py 를 모듈로 불러오기 (파일명에 '-'가 있어 import 문으로는 불가)
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("gym_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# 부하 테스트용 대용량 데이터베이스 생성 (현재 작업 디렉터리의 gym_management.db)
+def generate_large_database(members=5000, trainers=50, workouts=200000, classes=2000, bookings=20000, seed=42):
+    rng = random.Random(seed)
+    load_app_module().init_database()
+
+    conn = sqlite3.connect('gym_management.db')
+    cursor = conn.cursor()
+    today = datetime.now().date()
+
+    cursor.executemany('''
+        INSERT INTO members (name, email, phone, membership_type, start_date, end_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(f"회원{i}", f"member{i}@load.test", f"010-0000-{i % 10000:04d}",
+           rng.choice(["일반", "프리미엄", "VIP"]),
+           today - timedelta(days=rng.randint(0, 365)),
+           today + timedelta(days=rng.randint(-30, 365)))
+          for i in range(1, members + 1)])
+
+    cursor.executemany('''
+        INSERT INTO trainers (name, specialty, experience_years, rating)
+        VALUES (?, ?, ?, ?)
+    ''', [(f"트레이너{i}", rng.choice(["웨이트 트레이닝", "요가/필라테스", "크로스핏", "수영"]),
+           rng.randint(1, 15), round(rng.uniform(3.5, 5.0), 1))
+          for i in range(1, trainers + 1)])
+
+    cursor.executemany('''
+        INSERT INTO workout_records
+        (member_id, exercise_name, sets, reps, weight, duration, calories_burned, date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', ((rng.randint(1, members), rng.choice(EXERCISES), rng.randint(3, 5), rng.randint(8, 15),
+           rng.randint(20, 100), rng.randint(30, 90), rng.randint(150, 400),
+           today - timedelta(days=rng.randint(0, 365)))
+          for _ in range(workouts)))
+
+    cursor.executemany('''
+        INSERT INTO classes (class_name, trainer_id, date, time, duration, max_capacity)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(rng.choice(CLASS_NAMES), rng.randint(1, trainers),
+           today + timedelta(days=rng.randint(-180, 60)),
+           f"{rng.randint(6, 21):02d}:00", 60, rng.randint(8, 30))
+          for _ in range(classes)])
+
+    cursor.executemany('''
+        INSERT INTO bookings (member_id, class_id, booking_date)
+        VALUES (?, ?, ?)
+    ''', [(rng.randint(1, members), rng.randint(1, classes), today) for _ in range(bookings)])
+
+    # 예약 수 카운터를 실제 예약 수에 맞춤
+    cursor.execute('''
+        UPDATE classes SET current_bookings = MIN(max_capacity, (
+            SELECT COUNT(*) FROM bookings b WHERE b.class_id = classes.id AND b.status = 'confirmed'
+        ))
+    ''')
+
+    conn.commit()
+    conn.close()
+
+# 라벨로 위젯 찾기 (같은 라벨이 여러 개면 화면 순서상 첫 번째)
+def find_widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(label)
+
+# 데이터베이스에서 선택 후보 id 조회 (앱과 같은 작업 디렉터리의 gym_management.db)
+def query_ids(sql, params=()):
+    conn = sqlite3.connect('gym_management.db', timeout=30)
+    try:
+        return [row[0] for row in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+# 선택 상자는 라벨이 아니라 옵션 값(id)으로 선택
+# (앱의 format_func 가 id -> 라벨 사전이므로 라벨 문자열을 값으로 넣으면 옵션을 찾지 못함)
+# 후보 id 중 화면에 표시된 옵션만 남겨서 선택
+def pick(selectbox, rng, ids):
+    shown = set(selectbox.options)
+    ids = [option_id for option_id in ids if selectbox.format_func(option_id) in shown]
+    if ids:
+        selectbox.set_value(rng.choice(ids))
+
+def active_member_ids():
+    return query_ids("SELECT id FROM members WHERE status = 'active'")
+
+def upcoming_class_ids():
+    return query_ids("SELECT id FROM classes WHERE date_day >= ?", (to_epoch_day(datetime.now()),))
+
+# 시나리오: 운동 기록 추가
+def log_workout(at, rng):
+    pick(at.selectbox(key="workout_record_member_select"), rng, active_member_ids())
+    at.selectbox(key="workout_record_exercise_select").select(rng.choice(EXERCISES))
+    find_widget(at.number_input, "세트").set_value(rng.randint(3, 5))
+    find_widget(at.number_input, "횟수").set_value(rng.randint(8, 15))
+    find_widget(at.number_input, "무게(kg)").set_value(float(rng.randint(20, 100)))
+    find_widget(at.button, "기록 추가").click()
+
+# 시나리오: 수업 예약
+def book_class(at, rng):
+    pick(at.selectbox(key="class_booking_class_select"), rng, upcoming_class_ids())
+    pick(at.selectbox(key="class_booking_member_select"), rng, active_member_ids())
+    find_widget(at.button, "예약하기").click()
+
+# 시나리오: 분석 리포트 열기 (세션 캐시를 비워 실제 조회가 일어나도록 함)
+def open_analytics(at, rng):
+    at.session_state['analytics_results'] = None
+
+# 시나리오: 회원 등록
+def register_member(at, rng):
+    suffix = f"{os.getpid()}-{threading.get_ident()}-{rng.getrandbits(32)}"
+    find_widget(at.text_input, "이름").input(f"부하{suffix}")
+    find_widget(at.text_input, "이메일").input(f"load-{suffix}@load.test")
+    find_widget(at.text_input, "전화번호").input("010-9999-9999")
+    find_widget(at.button, "등록").click()
+
+SCENARIOS = {
+    'log_workout': log_workout,
+    'book_class': book_class,
+    'open_analytics': open_analytics,
+    'register_member': register_member,
+}
+
+# 예외 분류: SQLITE_BUSY(database is locked) 와 그 밖의 오류
+def classify(at):
+    outcome = 'ok'
+    for exception in at.exception:
+        message = str(exception.value)
+        if 'database is locked' in message or 'database is busy' in message:
+            return 'busy'
+        outcome = 'error'
+    return outcome
+
+# 세션 하나: 앱을 열고 시나리오를 순서대로 반복
+def run_session(session_id, iterations, timeout, seed):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    samples = []
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    samples.append(('open_app', time.perf_counter() - start, classify(at)))
+
+    for _ in range(iterations):
+        for name, scenario in SCENARIOS.items():
+            failed = False
+            try:
+                scenario(at, rng)
+            except LookupError:
+                # 화면에 위젯이 없으면 (예: 예약 가능한 수업 없음) 새로 그리기만 측정
+                pass
+            except Exception:
+                # 입력 단계 실패도 오류로 집계하고 세션은 계속 진행
+                failed = True
+            start = time.perf_counter()
+            try:
+                at.run()
+                outcome = classify(at)
+            except RuntimeError:
+                # AppTest 시간 초과
+                outcome = 'timeout'
+            except Exception:
+                # 상호작용 하나의 실패로 세션(과 프로세스 풀) 전체가 끝나지 않도록 오류로만 집계
+                outcome = 'error'
+            samples.append((name, time.perf_counter() - start, 'error' if failed else outcome))
+
+    return samples
+
+# 프로세스 하나: 스레드마다 세션 하나씩 실행
+def run_process(workdir, first_session, threads, iterations, timeout, seed):
+    os.chdir(workdir)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(run_session, first_session + i, iterations, timeout, seed)
+                   for i in range(threads)]
+        samples = []
+        for future in futures:
+            samples.extend(future.result())
+    return samples
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def report(samples, elapsed):
+    by_action = defaultdict(list)
+    outcomes = defaultdict(int)
+    for action, latency, outcome in samples:
+        by_action[action].append(latency)
+        outcomes[outcome] += 1
+
+    print(f"{'시나리오':<16}{'횟수':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}")
+    for action, latencies in list(by_action.items()) + [('전체', [s[1] for s in samples])]:
+        print(f"{action:<16}{len(latencies):>8}"
+              f"{percentile(latencies, 50) * 1000:>12.1f}"
+              f"{percentile(latencies, 95) * 1000:>12.1f}"
+              f"{percentile(latencies, 99) * 1000:>12.1f}")
+
+    print(f"총 상호작용: {len(samples)}건, 소요 시간: {elapsed:.1f}s, 처리량: {len(samples) / elapsed:.2f} 건/s")
+    print(f"SQLITE_BUSY: {outcomes['busy']}건, 기타 오류: {outcomes['error']}건, 시간 초과: {outcomes['timeout']}건")
+
+def main():
+    parser = argparse.ArgumentParser(description="AppTest 기반 동시 세션 부하 테스트")
+    parser.add_argument("--processes", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=10, help="프로세스당 동시 세션 수")
+    parser.add_argument("--iterations", type=int, default=5, help="세션당 시나리오 반복 횟수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="상호작용 하나의 최대 시간 (초)")
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--workouts", type=int, default=200000)
+    parser.add_argument("--classes", type=int, default=2000)
+    parser.add_argument("--bookings", type=int, default=20000)
+    parser.add_argument("--workdir", help="데이터베이스를 만들 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="gym-loadtest-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    if not os.path.exists('gym_management.db'):
+        print(f"대용량 데이터베이스 생성 중: {workdir}")
+        generate_large_database(members=args.members, workouts=args.workouts,
+                                classes=args.classes, bookings=args.bookings, seed=args.seed)
+
+    sessions = args.processes * args.threads
+    print(f"세션 {sessions}개 ({args.processes} 프로세스 x {args.threads} 스레드), "
+          f"세션당 {args.iterations}회 반복")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processes) as pool:
+        futures = [pool.submit(run_process, workdir, p * args.threads, args.threads,
+                               args.iterations, args.timeout, args.seed)
+                   for p in range(args.processes)]
+        samples = []
+        for future in futures:
+            samples.extend(future.result())
+    elapsed = time.perf_counter() - start
+
+    report(samples, elapsed)
+
+if __name__ == "__main__":
+    main()
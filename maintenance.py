@@ -0,0 +1,205 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 반환할 빈 페이지 수 (단계마다 짧은 쓰기 트랜잭션으로 나눠 처리)
+VACUUM_STEP_PAGES = 200
+# 한 번의 점검에서 반환할 최대 페이지 수 / 최대 시간
+MAX_VACUUM_PAGES = 20000
+MAX_VACUUM_SECONDS = 30
+# ANALYZE 가 인덱스마다 살펴보는 최대 행 수 (큰 테이블에서도 빠르게 끝나도록 제한)
+ANALYSIS_LIMIT = 1000
+
+# auto_vacuum 값 (0 = NONE, 1 = FULL, 2 = INCREMENTAL)
+AUTO_VACUUM_INCREMENTAL = 2
+
+# 데이터베이스별 마지막 점검 결과 (대시보드 표시용)
+_last_reports = {}
+_report_lock = threading.Lock()
+
+def _pragma(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def _timed(steps, name, fn):
+    start = time.perf_counter()
+    detail = fn()
+    elapsed = time.perf_counter() - start
+    steps.append({'step': name, 'elapsed': elapsed, **detail})
+    logger.info("DB 점검 [%s] %.3fs %s", name, elapsed, detail)
+    return detail
+
+# 플래너 통계 갱신: 통계가 없으면 ANALYZE, 있으면 PRAGMA optimize (필요한 테이블만 다시 분석)
+def optimize(conn):
+    conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'").fetchone() is not None
+
+    if has_stats:
+        conn.execute("PRAGMA optimize")
+    else:
+        conn.execute("ANALYZE")
+
+    analyzed = conn.execute("SELECT COUNT(DISTINCT tbl) FROM sqlite_stat1").fetchone()[0]
+    return {'action': 'optimize' if has_stats else 'analyze', 'analyzed_tables': analyzed}
+
+# 증분 vacuum 모드로 전환 (기존 파일은 전체 VACUUM 한 번이 필요하므로 점검 시간대에만 실행)
+def enable_incremental_vacuum(conn):
+    if _pragma(conn, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+        return {'converted': False}
+
+    # WAL 모드에서는 체크포인트 전까지 파일 크기가 그대로이므로 페이지 수로 비교
+    pages_before = _pragma(conn, "page_count")
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+    return {'converted': True, 'reclaimed_bytes': (pages_before - _pragma(conn, "page_count")) * _pragma(conn, "page_size")}
+
+# 빈 페이지를 step_pages 개씩 반환 (max_pages 또는 max_seconds 에 도달하면 다음 점검으로 미룸)
+def incremental_vacuum(conn, step_pages=VACUUM_STEP_PAGES, max_pages=MAX_VACUUM_PAGES,
+                       max_seconds=MAX_VACUUM_SECONDS):
+    if _pragma(conn, "auto_vacuum") != AUTO_VACUUM_INCREMENTAL:
+        return {'skipped': 'auto_vacuum != INCREMENTAL'}
+
+    page_size = _pragma(conn, "page_size")
+    free_before = _pragma(conn, "freelist_count")
+    deadline = time.perf_counter() + max_seconds
+    released = 0
+
+    free = free_before
+    while free > 0 and released < max_pages and time.perf_counter() < deadline:
+        pages = min(step_pages, free, max_pages - released)
+        # execute() 는 결과 열이 없는 문장을 한 단계만 실행해 한 페이지만 반환되므로 executescript 로 끝까지 실행
+        conn.executescript(f"PRAGMA incremental_vacuum({pages});")
+
+        # 요청한 페이지 수가 아니라 실제로 줄어든 빈 페이지 수로 계산
+        remaining = _pragma(conn, "freelist_count")
+        if remaining >= free:
+            break
+        released += free - remaining
+        free = remaining
+
+    free_after = _pragma(conn, "freelist_count")
+    return {
+        'free_pages_before': free_before,
+        'free_pages_after': free_after,
+        'reclaimed_bytes': (free_before - free_after) * page_size,
+    }
+
+# WAL 내용을 DB 파일에 반영하고 WAL 파일을 비움
+def checkpoint(conn, db_path):
+    wal_path = db_path + '-wal'
+    wal_before = _file_size(wal_path)
+    busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    return {
+        'busy': bool(busy),
+        'log_frames': log_frames,
+        'checkpointed_frames': checkpointed,
+        'reclaimed_bytes': wal_before - _file_size(wal_path),
+    }
+
+# 빠른 무결성 검사 (인덱스 내용 대조는 생략하는 quick_check)
+def quick_check(conn):
+    problems = [row[0] for row in conn.execute("PRAGMA quick_check").fetchall()]
+    ok = problems == ['ok']
+    if not ok:
+        logger.error("DB 무결성 검사 실패: %s", problems[:10])
+    return {'ok': ok, 'problems': [] if ok else problems}
+
+# 전체 점검 실행: 통계 갱신 -> 증분 vacuum -> WAL 체크포인트 -> 무결성 검사
+def run_maintenance(db_path='gym_management.db', convert=True, step_pages=VACUUM_STEP_PAGES,
+                    max_pages=MAX_VACUUM_PAGES, max_seconds=MAX_VACUUM_SECONDS, check=True):
+    start = time.perf_counter()
+    size_before = _file_size(db_path) + _file_size(db_path + '-wal')
+
+    # 자동 커밋 모드: PRAGMA 단계마다 각자 짧은 트랜잭션으로 실행
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    steps = []
+    try:
+        _timed(steps, 'optimize', lambda: optimize(conn))
+        if convert:
+            _timed(steps, 'auto_vacuum', lambda: enable_incremental_vacuum(conn))
+        _timed(steps, 'incremental_vacuum',
+               lambda: incremental_vacuum(conn, step_pages, max_pages, max_seconds))
+        _timed(steps, 'checkpoint', lambda: checkpoint(conn, db_path))
+        if check:
+            _timed(steps, 'quick_check', lambda: quick_check(conn))
+    finally:
+        conn.close()
+
+    size_after = _file_size(db_path) + _file_size(db_path + '-wal')
+    report = {
+        'steps': steps,
+        'size_before': size_before,
+        'size_after': size_after,
+        'reclaimed_bytes': size_before - size_after,
+        'elapsed': time.perf_counter() - start,
+        'finished_at': datetime.now(),
+    }
+    with _report_lock:
+        _last_reports[db_path] = report
+
+    logger.info("DB 점검 완료 (%s): %.1fKB -> %.1fKB, %.3fs",
+                db_path, size_before / 1024, size_after / 1024, report['elapsed'])
+    return report
+
+def get_last_maintenance_report(db_path='gym_management.db'):
+    with _report_lock:
+        return _last_reports.get(db_path)
+
+# 점검 시간대(start_hour 시 ~ end_hour 시)에 하루 한 번 점검 실행 (check_interval 초마다 확인)
+def start_maintenance(db_path='gym_management.db', start_hour=4, end_hour=6, check_interval=600):
+    def run():
+        last_run_date = None
+        while True:
+            now = datetime.now()
+            if start_hour <= now.hour < end_hour and last_run_date != now.date():
+                try:
+                    run_maintenance(db_path)
+                except sqlite3.Error:
+                    logger.exception("DB 점검 실패")
+                last_run_date = now.date()
+            time.sleep(check_interval)
+
+    thread = threading.Thread(target=run, name="db-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="DB 점검: ANALYZE/optimize, 증분 vacuum, WAL 체크포인트, 무결성 검사")
+    parser.add_argument("--db", default="gym_management.db")
+    parser.add_argument("--no-convert", action="store_true",
+                        help="auto_vacuum 이 INCREMENTAL 이 아니어도 전체 VACUUM 으로 전환하지 않음")
+    parser.add_argument("--step-pages", type=int, default=VACUUM_STEP_PAGES)
+    parser.add_argument("--max-pages", type=int, default=MAX_VACUUM_PAGES)
+    parser.add_argument("--max-seconds", type=float, default=MAX_VACUUM_SECONDS)
+    parser.add_argument("--skip-check", action="store_true", help="quick_check 생략")
+    parser.add_argument("--schedule", action="store_true",
+                        help="바로 실행하지 않고 점검 시간대에 하루 한 번씩 계속 실행")
+    parser.add_argument("--start-hour", type=int, default=4)
+    parser.add_argument("--end-hour", type=int, default=6)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.schedule:
+        start_maintenance(args.db, args.start_hour, args.end_hour).join()
+        return
+
+    report = run_maintenance(args.db, not args.no_convert, args.step_pages, args.max_pages,
+                             args.max_seconds, not args.skip_check)
+    for step in report['steps']:
+        detail = {k: v for k, v in step.items() if k not in ('step', 'elapsed')}
+        print(f"{step['step']:<20}{step['elapsed']:>8.3f}s  {detail}")
+    print(f"파일 크기: {report['size_before'] / 1024:.1f}KB -> {report['size_after'] / 1024:.1f}KB "
+          f"(반환 {report['reclaimed_bytes'] / 1024:.1f}KB), 소요 시간: {report['elapsed']:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# 회원별/운동별 개인 기록 (최대 무게, 추정 1RM, 세션 최고 볼륨)
+# workout_records 에 기록이 추가/삭제/수정될 때 트리거로 해당 행만 갱신
+
+# 추정 1RM (Epley 공식: weight x (1 + reps / 30))
+E1RM_SQL = "{p}weight * (1 + {p}reps / 30.0)"
+# 세션 볼륨 (sets x reps x weight)
+VOLUME_SQL = "{p}sets * {p}reps * {p}weight"
+
+def e1rm_sql(prefix=''):
+    return E1RM_SQL.format(p=prefix)
+
+def volume_sql(prefix=''):
+    return VOLUME_SQL.format(p=prefix)
+
+# 최고치 컬럼: (개인 기록 컬럼, 운동 기록 식, 삭제된 기록의 값, 같은 값 이상인 다른 기록을 찾는 조건)
+# 추정 1RM/볼륨 조건에 weight >= OLD.weight 를 붙여 인덱스 범위 검색으로 같은 기록을 바로 찾음
+# (더 가벼운 기록만 같은 값을 가진 경우는 찾지 못하고 재계산하므로 결과는 항상 정확)
+def best_columns():
+    return [
+        ('max_weight', 'weight', 'OLD.weight', 'weight >= OLD.weight'),
+        ('best_e1rm', e1rm_sql(), e1rm_sql('OLD.'), f"weight >= OLD.weight AND {e1rm_sql()} >= {e1rm_sql('OLD.')}"),
+        ('best_volume', volume_sql(), volume_sql('OLD.'), f"weight >= OLD.weight AND {volume_sql()} >= {volume_sql('OLD.')}"),
+        ('last_date', 'date', 'OLD.date', 'date >= OLD.date'),
+    ]
+
+# 트리거 정의 (이름: CREATE TRIGGER 문)
+def trigger_definitions():
+    # 기록 추가: 기존 최고치와 비교해 갱신 (MAX(a, NULL) 은 NULL 이므로 양쪽 모두 COALESCE)
+    upsert = ',\n                '.join(
+        f"{column} = MAX(COALESCE({column}, excluded.{column}), COALESCE(excluded.{column}, {column}))"
+        for column, _, _, _ in best_columns())
+    insert = f'''
+        CREATE TRIGGER trg_workout_records_pr_insert
+        AFTER INSERT ON workout_records
+        BEGIN
+            INSERT INTO personal_records
+                (member_id, exercise_name, max_weight, best_e1rm, best_volume, sessions, last_date)
+            VALUES
+                (NEW.member_id, NEW.exercise_name, NEW.weight, {e1rm_sql('NEW.')}, {volume_sql('NEW.')}, 1, NEW.date)
+            ON CONFLICT (member_id, exercise_name) DO UPDATE SET
+                {upsert},
+                sessions = sessions + 1;
+        END
+    '''
+
+    # 기록 삭제: 세션 수 감소, 삭제된 기록이 최고치였고 같은 값 이상인 다른 기록이 없을 때만 그 컬럼을 재계산
+    # 같은 최고치를 가진 기록을 여러 건 지워도 행마다 인덱스 검색 한 번으로 끝남 (그룹 전체 재계산 없음)
+    recompute = ',\n                '.join(f'''{column} = CASE
+                    WHEN {old} >= {column} AND NOT EXISTS (
+                        SELECT 1 FROM workout_records
+                        WHERE member_id = OLD.member_id AND exercise_name = OLD.exercise_name AND {probe})
+                    THEN (SELECT MAX({expression}) FROM workout_records
+                          WHERE member_id = OLD.member_id AND exercise_name = OLD.exercise_name)
+                    ELSE {column} END'''
+        for column, expression, old, probe in best_columns())
+    is_best = ' OR '.join(f"{old} >= {column}" for column, _, old, _ in best_columns())
+    delete = f'''
+        CREATE TRIGGER trg_workout_records_pr_delete
+        AFTER DELETE ON workout_records
+        BEGIN
+            UPDATE personal_records SET sessions = sessions - 1
+            WHERE member_id = OLD.member_id AND exercise_name = OLD.exercise_name;
+
+            DELETE FROM personal_records
+            WHERE member_id = OLD.member_id AND exercise_name = OLD.exercise_name AND sessions <= 0;
+
+            UPDATE personal_records SET
+                {recompute}
+            WHERE member_id = OLD.member_id AND exercise_name = OLD.exercise_name
+              AND ({is_best});
+        END
+    '''
+
+    # 기록 수정: 삭제 + 추가로 처리 (이전/새 회원/운동의 개인 기록을 지우고 인덱스로 다시 계산)
+    # 회원이나 운동명이 바뀌면 두 묶음 모두, 같으면 한 묶음만 재계산
+    update = f'''
+        CREATE TRIGGER trg_workout_records_pr_update
+        AFTER UPDATE OF member_id, exercise_name, sets, reps, weight, date ON workout_records
+        BEGIN
+            DELETE FROM personal_records
+            WHERE member_id = OLD.member_id AND exercise_name = OLD.exercise_name;
+
+            DELETE FROM personal_records
+            WHERE member_id = NEW.member_id AND exercise_name = NEW.exercise_name;
+
+            INSERT INTO personal_records
+                (member_id, exercise_name, max_weight, best_e1rm, best_volume, sessions, last_date)
+            SELECT member_id, exercise_name, MAX(weight), MAX({e1rm_sql()}), MAX({volume_sql()}),
+                   COUNT(*), MAX(date)
+            FROM workout_records
+            WHERE (member_id = OLD.member_id AND exercise_name = OLD.exercise_name)
+               OR (member_id = NEW.member_id AND exercise_name = NEW.exercise_name)
+            GROUP BY member_id, exercise_name;
+        END
+    '''
+
+    return {
+        'trg_workout_records_pr_insert': insert,
+        'trg_workout_records_pr_delete': delete,
+        'trg_workout_records_pr_update': update,
+    }
+
+def _normalize(sql):
+    return ' '.join(sql.split())
+
+# 개인 기록 테이블, 인덱스, 트리거 생성 (처음 만들 때는 기존 기록으로 한 번 채움)
+# 저장된 트리거 정의가 현재 정의와 다르면 다시 만들고, 이전 트리거가 남긴 값을 바로잡기 위해 다시 채움
+def create_personal_records(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'personal_records'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS personal_records (
+            member_id INTEGER NOT NULL,
+            exercise_name TEXT NOT NULL,
+            max_weight REAL,
+            best_e1rm REAL,
+            best_volume REAL,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            last_date DATE,
+            PRIMARY KEY (member_id, exercise_name),
+            FOREIGN KEY (member_id) REFERENCES members (id)
+        )
+    ''')
+
+    # 회원/운동별 최고치 검색과 재계산이 테이블을 읽지 않고 인덱스만 읽도록 계산에 쓰는 컬럼을 모두 포함
+    cursor.execute("DROP INDEX IF EXISTS idx_workout_records_member_exercise")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_workout_records_member_exercise_best
+        ON workout_records (member_id, exercise_name, weight, reps, sets, date)
+    ''')
+
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'workout_records'")
+    stored = {name: _normalize(sql) for name, sql in cursor.fetchall()}
+
+    changed = False
+    for name, sql in trigger_definitions().items():
+        if stored.get(name) == _normalize(sql):
+            continue
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(sql)
+        changed = True
+
+    if not exists or changed:
+        backfill_personal_records(cursor)
+
+# 기존 운동 기록으로 개인 기록 다시 채우기 (테이블을 처음 만들거나 트리거 정의가 바뀐 경우에만 실행)
+def backfill_personal_records(cursor):
+    cursor.execute("DELETE FROM personal_records")
+    cursor.execute(f'''
+        INSERT INTO personal_records
+            (member_id, exercise_name, max_weight, best_e1rm, best_volume, sessions, last_date)
+        SELECT member_id, exercise_name, MAX(weight), MAX({e1rm_sql()}), MAX({volume_sql()}),
+               COUNT(*), MAX(date)
+        FROM workout_records
+        GROUP BY member_id, exercise_name
+    ''')
+
+# 회원의 개인 기록 조회 (기본 키 (member_id, exercise_name) 범위 조회)
+def get_personal_records(conn, member_id):
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT exercise_name, max_weight, best_e1rm, best_volume, sessions, last_date
+        FROM personal_records
+        WHERE member_id = ?
+        ORDER BY last_date DESC, sessions DESC
+    ''', (member_id,))
+    return cursor.fetchall()
@@ -0,0 +1,233 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+
+# 구간 분류 (스택의 가장 안쪽부터 보며 처음 맞는 경로의 구간으로 집계)
+CATEGORIES = [
+    ('SQL', ('sqlite3', os.path.join('pandas', 'io', 'sql'))),
+    ('Plotly', ('plotly',)),
+    ('pandas', ('pandas', 'numpy')),
+    ('Streamlit', ('streamlit',)),
+]
+
+PROFILER_FILE = os.path.abspath(__file__)
+# 앱 파일이 있는 디렉터리 (이 디렉터리 바로 아래의 .py 파일만 앱 코드로 봄, 하위의 가상환경 등은 제외)
+APP_DIR = os.path.dirname(PROFILER_FILE)
+
+@lru_cache(maxsize=None)
+def _abspath(filename):
+    return os.path.abspath(filename)
+
+# 프로파일링 중 sqlite3 호출 기록용 연결/커서
+# cursor.execute 등은 C 함수라 샘플 스택에 보이지 않으므로, 파이썬 메서드로 감싸 호출한 쪽 아래에 SQL 구간으로 나타나게 함
+class ProfiledCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        return super().execute(*args)
+
+    def executemany(self, *args):
+        return super().executemany(*args)
+
+    def executescript(self, *args):
+        return super().executescript(*args)
+
+    def fetchone(self):
+        return super().fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        return super().fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        return super().fetchall()
+
+class ProfiledConnection(sqlite3.Connection):
+    # Connection.execute 등도 내부에서 cursor() 를 호출하므로 여기서 커서 종류를 바꿈
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        return super().commit()
+
+_original_connect = sqlite3.connect
+_patch_lock = threading.Lock()
+_patch_depth = 0
+
+def _profiled_connect(*args, **kwargs):
+    kwargs.setdefault('factory', ProfiledConnection)
+    return _original_connect(*args, **kwargs)
+
+# 프로파일링 중인 세션이 하나라도 있는 동안만 sqlite3.connect 교체 (동시에 여러 세션이 켜고 꺼도 안전하게 계수)
+def _patch_sqlite(enable):
+    global _patch_depth
+    with _patch_lock:
+        _patch_depth += 1 if enable else -1
+        sqlite3.connect = _profiled_connect if _patch_depth > 0 else _original_connect
+
+# 샘플링 프로파일러: 별도 스레드가 interval 마다 대상 스레드의 호출 스택을 기록
+# with 블록을 연 스레드(Streamlit 스크립트 스레드)를 대상으로 함
+# 구간/구역 집계는 root 함수 안쪽의 프레임만 사용 (바깥의 Streamlit 스크립트 실행 프레임은 제외)
+class SamplingProfiler:
+    def __init__(self, interval=0.001, root='render_app', app_dir=APP_DIR):
+        self.interval = interval
+        self.root = root
+        self.app_dir = app_dir
+        self.samples = []
+        self.elapsed = 0.0
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        _patch_sqlite(True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._sampler.join()
+        _patch_sqlite(False)
+        self.elapsed = time.perf_counter() - self._start
+        return False
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                # 샘플 간 실제 경과 시간을 가중치로 사용 (GIL 대기로 간격이 늘어나도 보정)
+                self.samples.append((tuple(stack), now - last))
+            last = now
+
+    def _is_app_file(self, filename):
+        return os.path.dirname(_abspath(filename)) == self.app_dir
+
+    # root 함수(가장 바깥의 것)부터 안쪽의 프레임만 남김, root 가 없는 샘플은 빈 스택
+    def _app_stack(self, stack):
+        for index, (name, filename, _) in enumerate(stack):
+            if name == self.root and self._is_app_file(filename):
+                return stack[index:]
+        return ()
+
+    # 앱 파일의 show_* 함수별 시간 (스택에서 가장 안쪽의 show_* 로 귀속)
+    def section_times(self, prefix='show_'):
+        totals = defaultdict(float)
+        for stack, weight in self.samples:
+            section = '(기타)'
+            for name, filename, _ in reversed(self._app_stack(stack)):
+                if name.startswith(prefix) and self._is_app_file(filename):
+                    section = name
+                    break
+            totals[section] += weight
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    # SQL / pandas / Plotly / Streamlit / 앱 코드 구간별 시간 (root 함수 안쪽에서 가장 안쪽 프레임 기준)
+    def category_times(self):
+        totals = defaultdict(float)
+        for stack, weight in self.samples:
+            totals[self._categorize(stack)] += weight
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    # 가장 안쪽 프레임부터 보며 처음 맞는 구간 (sqlite3 감싸기 -> 라이브러리 경로 -> 앱 파일 순으로 확인)
+    def _categorize(self, stack):
+        for _, filename, _ in reversed(self._app_stack(stack)):
+            if _abspath(filename) == PROFILER_FILE:
+                return 'SQL'
+            for category, markers in CATEGORIES:
+                if any(marker in filename for marker in markers):
+                    return category
+            if self._is_app_file(filename):
+                return '앱 코드'
+        return '(기타)'
+
+    # 함수별 자체 시간/누적 시간 상위 n개
+    def top_functions(self, n=20):
+        self_time = defaultdict(float)
+        total_time = defaultdict(float)
+        for stack, weight in self.samples:
+            if not stack:
+                continue
+            self_time[stack[-1]] += weight
+            for frame in set(stack):
+                total_time[frame] += weight
+
+        rows = []
+        for frame, total in total_time.items():
+            name, filename, line = frame
+            rows.append({
+                'function': name,
+                'location': f"{os.path.basename(filename)}:{line}",
+                'self_ms': self_time.get(frame, 0.0) * 1000,
+                'total_ms': total * 1000,
+            })
+        rows.sort(key=lambda row: row['self_ms'], reverse=True)
+        return rows[:n]
+
+    # 접힌 스택 형식 (flamegraph.pl / speedscope 에서 열 수 있음, 단위: 마이크로초)
+    def to_folded(self):
+        totals = defaultdict(float)
+        for stack, weight in self.samples:
+            totals[';'.join(f"{name} ({os.path.basename(filename)}:{line})"
+                            for name, filename, line in stack)] += weight
+        return '\n'.join(f"{key} {int(value * 1e6)}" for key, value in totals.items() if value > 0)
+
+    # speedscope 파일 형식 (sampled)
+    def to_speedscope(self, name='rerun'):
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, weight in self.samples:
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(weight)
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+            'name': name,
+            'exporter': 'gym-profiler',
+        }
+
+    # speedscope(.json)와 접힌 스택(.folded) 파일 저장, 저장한 경로 반환
+    def save(self, directory='profiles', name=None):
+        os.makedirs(directory, exist_ok=True)
+        name = name or datetime.now().strftime('profile-%Y%m%d-%H%M%S')
+        speedscope_path = os.path.join(directory, f"{name}.speedscope.json")
+        folded_path = os.path.join(directory, f"{name}.folded")
+
+        with open(speedscope_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_speedscope(name), f, ensure_ascii=False)
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_folded())
+
+        return speedscope_path, folded_path
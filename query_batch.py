@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from snapshot import connect_snapshot
+
+# 독립적인 조회 쿼리를 스레드 풀에서 병렬 실행
+# 작업자 스레드마다 읽기 연결을 하나씩 유지하고, 스냅샷 파일이 교체되면 다시 연결
+class QueryBatchExecutor:
+    def __init__(self, db_path='gym_analytics.db', max_workers=4, read_only=True):
+        self.db_path = db_path
+        self.read_only = read_only
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analytics-query")
+
+    # 현재 작업자 스레드의 읽기 연결
+    def _connection(self):
+        file_id = os.stat(self.db_path).st_ino
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None or self._local.file_id != file_id:
+            if conn is not None:
+                conn.close()
+            if self.read_only:
+                conn = connect_snapshot(self.db_path)
+            else:
+                conn = sqlite3.connect(self.db_path)
+            self._local.conn = conn
+            self._local.file_id = file_id
+
+        return conn
+
+    def _run(self, sql, params):
+        return pd.read_sql(sql, self._connection(), params=params)
+
+    # 쿼리 하나 제출 (결과는 DataFrame Future)
+    def submit(self, sql, params=None):
+        return self._pool.submit(self._run, sql, params)
+
+    # 이름별 쿼리 묶음 제출: {이름: sql 또는 (sql, params)} -> {이름: Future}
+    def submit_batch(self, queries):
+        futures = {}
+        for name, query in queries.items():
+            if isinstance(query, tuple):
+                sql, params = query
+            else:
+                sql, params = query, None
+            futures[name] = self.submit(sql, params)
+        return futures
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,128 @@
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 데이터베이스별 마지막 정합성 검사 결과 (대시보드 표시용)
+_last_reports = {}
+_report_lock = threading.Lock()
+
+# 예약 집계용 인덱스 (수업별 확정 예약 COUNT를 인덱스만으로 계산)
+def create_booking_count_index(cursor):
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bookings_class_status
+        ON bookings (class_id, status)
+    ''')
+
+# classes.current_bookings 를 실제 확정 예약 수와 비교해 보정
+# 수업 ID 순서대로 batch_size 개씩 하나의 GROUP BY 쿼리로 집계
+def reconcile_booking_counts(db_path='gym_management.db', batch_size=500):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    start = time.perf_counter()
+    last_id = 0
+    checked = 0
+    drifted = 0
+    total_drift = 0
+
+    while True:
+        # 집계와 보정을 배치 단위의 짧은 쓰기 트랜잭션으로 처리
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute('''
+                SELECT c.id, c.current_bookings, COUNT(b.id) as actual
+                FROM (
+                    SELECT id, current_bookings FROM classes
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                ) c
+                LEFT JOIN bookings b ON b.class_id = c.id AND b.status = 'confirmed'
+                GROUP BY c.id
+                ORDER BY c.id
+            ''', (last_id, batch_size))
+            rows = cursor.fetchall()
+
+            repairs = [(actual, class_id) for class_id, current, actual in rows if current != actual]
+            if repairs:
+                cursor.executemany("UPDATE classes SET current_bookings = ? WHERE id = ?", repairs)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            conn.close()
+            raise
+
+        if not rows:
+            break
+
+        checked += len(rows)
+        drifted += len(repairs)
+        total_drift += sum(abs((current or 0) - actual) for _, current, actual in rows)
+        last_id = rows[-1][0]
+
+        if len(rows) < batch_size:
+            break
+
+    conn.close()
+
+    report = {
+        'checked': checked,
+        'drifted': drifted,
+        'total_drift': total_drift,
+        'elapsed': time.perf_counter() - start,
+        'finished_at': datetime.now(),
+    }
+    _set_last_report(db_path, report)
+
+    logger.info("예약 수 정합성 검사: %d개 수업 중 %d개 보정 (총 차이 %d, %.3fs)",
+                checked, drifted, total_drift, report['elapsed'])
+    return report
+
+def _set_last_report(db_path, report):
+    with _report_lock:
+        _last_reports[db_path] = report
+
+def get_last_report(db_path='gym_management.db'):
+    with _report_lock:
+        return _last_reports.get(db_path)
+
+# 백그라운드 정합성 검사 스레드 (interval 초마다 실행)
+def start_reconciler(db_path='gym_management.db', interval=300, batch_size=500):
+    def run():
+        while True:
+            try:
+                reconcile_booking_counts(db_path, batch_size)
+            except sqlite3.Error:
+                logger.exception("예약 수 정합성 검사 실패")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="booking-reconciler", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="classes.current_bookings 정합성 검사 및 보정")
+    parser.add_argument("--db", default="gym_management.db")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval", type=int, default=0,
+                        help="0보다 크면 해당 초 간격으로 반복 실행")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    while True:
+        report = reconcile_booking_counts(args.db, args.batch_size)
+        print(f"검사: {report['checked']}개, 보정: {report['drifted']}개, "
+              f"총 차이: {report['total_drift']}, 소요 시간: {report['elapsed']:.3f}s")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# WAL 이 아닌 원본을 나눠 복사할 때 허용하는 재시작 횟수 (넘으면 한 번에 복사)
+MAX_BACKUP_RESTARTS = 3
+
+class _TooManyRestarts(Exception):
+    pass
+
+# 온라인 백업 API 로 src -> dst 복사, 반환값: 원본 변경으로 처음부터 다시 시작한 횟수
+# WAL 원본: 한 번의 읽기 트랜잭션으로 한 번에 복사 (쓰기를 막지 않고, 다른 연결의 커밋으로 재시작되지 않음)
+# 그 외: 단계 사이 쓰기를 허용하도록 pages 단위로 나눠 복사하되, 다른 연결이 커밋할 때마다 처음부터 다시 시작하므로
+#        재시작이 max_restarts 를 넘으면 중단하고 한 번에 복사 (복사하는 동안만 쓰기 대기)
+def backup_database(src, dst, pages=256, sleep=0.005, max_restarts=MAX_BACKUP_RESTARTS):
+    if src.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal':
+        src.backup(dst, pages=-1)
+        return 0
+
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            logger.warning("스냅샷 복사 재시작 %d회 (원본 변경, 남은 페이지 %d/%d)", restarts, remaining, total)
+            if restarts > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+
+    try:
+        src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+    except _TooManyRestarts:
+        logger.warning("스냅샷 복사 재시작이 %d회를 넘어 한 번에 복사", max_restarts)
+        src.backup(dst, pages=-1)
+    return restarts
+
+# 분석용 읽기 전용 복제본을 온라인 백업 API로 갱신 (임시 파일에 복사한 뒤 교체)
+def refresh_snapshot(db_path='gym_management.db', snapshot_path='gym_analytics.db', pages=256, sleep=0.005):
+    start = time.perf_counter()
+    tmp_path = snapshot_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        restarts = backup_database(src, dst, pages, sleep)
+
+        # 스냅샷 기준 시각 기록
+        taken_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        dst.execute("CREATE TABLE IF NOT EXISTS snapshot_meta (taken_at TEXT)")
+        dst.execute("DELETE FROM snapshot_meta")
+        dst.execute("INSERT INTO snapshot_meta (taken_at) VALUES (?)", (taken_at,))
+        dst.commit()
+
+        # 읽기 전용으로 열 수 있도록 WAL 대신 단일 파일 모드로 저장
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+        src.close()
+
+    # 기존 복제본을 읽고 있는 연결은 교체 전 파일을 계속 사용
+    os.replace(tmp_path, snapshot_path)
+
+    logger.info("분석용 스냅샷 갱신 완료 (%s, %.3fs, 재시작 %d회)", taken_at, time.perf_counter() - start, restarts)
+    return taken_at
+
+# 분석용 복제본 읽기 전용 연결
+def connect_snapshot(snapshot_path='gym_analytics.db', check_same_thread=True):
+    uri = Path(snapshot_path).absolute().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+
+# 스냅샷 파일 버전 (교체될 때마다 바뀜, 캐시 키로 사용)
+def snapshot_version(snapshot_path='gym_analytics.db'):
+    stat = os.stat(snapshot_path)
+    return (stat.st_ino, stat.st_mtime_ns)
+
+# 복제본이 없으면 즉시 생성
+def ensure_snapshot(db_path='gym_management.db', snapshot_path='gym_analytics.db'):
+    if not os.path.exists(snapshot_path):
+        refresh_snapshot(db_path, snapshot_path)
+
+# 백그라운드 스냅샷 갱신 스레드 (interval 초마다 확인)
+# 원본의 PRAGMA data_version 이 바뀐 경우에만 복사하므로 변경이 없으면 스냅샷 파일도 그대로 유지
+def start_snapshotter(db_path='gym_management.db', snapshot_path='gym_analytics.db', interval=60):
+    def run():
+        watch = sqlite3.connect(db_path)
+        last_version = None
+        while True:
+            try:
+                data_version = watch.execute("PRAGMA data_version").fetchone()[0]
+                if data_version != last_version or not os.path.exists(snapshot_path):
+                    refresh_snapshot(db_path, snapshot_path)
+                    last_version = data_version
+            except (sqlite3.Error, OSError):
+                logger.exception("분석용 스냅샷 갱신 실패")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="analytics-snapshot", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="분석용 읽기 전용 스냅샷 갱신")
+    parser.add_argument("--db", default="gym_management.db")
+    parser.add_argument("--snapshot", default="gym_analytics.db")
+    parser.add_argument("--pages", type=int, default=256, help="WAL 이 아닌 원본에서 백업 단계당 복사할 페이지 수")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="0보다 크면 해당 초 간격으로 반복 실행")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    while True:
+        taken_at = refresh_snapshot(args.db, args.snapshot, args.pages)
+        print(f"스냅샷 기준 시각: {taken_at}")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
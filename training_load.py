@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+
+from date_encoding import to_epoch_day
+
+# 급성(최근 7일) / 만성(최근 28일) 부하 기간
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+# ACWR(급성:만성 부하 비율) 경고 기준
+OVERTRAINING_RATIO = 1.5
+DETRAINING_RATIO = 0.8
+
+# 부하 지표별 계산식
+LOAD_METRICS = {
+    'volume': "SUM(sets * reps * weight)",
+    'duration': "SUM(duration)",
+    'calories': "SUM(calories_burned)",
+}
+
+# 기간 조회용 인덱스 (정수 날짜 범위 + 회원 + 부하 계산 컬럼을 인덱스만으로 읽음)
+# date_day 생성 컬럼이 필요하므로 migrate_date_columns 이후에 호출
+def create_training_load_index(cursor):
+    cursor.execute("DROP INDEX IF EXISTS idx_workout_records_date_member")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_workout_records_day_member
+        ON workout_records (date_day, member_id, sets, reps, weight, duration, calories_burned)
+    ''')
+
+# 기간 내 회원별/일별 부하를 NumPy 배열로 조회
+# 반환값: (회원 ID 배열, as_of 기준 일 오프셋 배열 (0 = 첫날), 부하 배열)
+def load_daily_arrays(conn, as_of, days=CHRONIC_DAYS, metric='volume'):
+    end_day = to_epoch_day(as_of)
+    start_day = end_day - (days - 1)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT member_id,
+               date_day - ? as day_offset,
+               {LOAD_METRICS[metric]} as load
+        FROM workout_records
+        WHERE date_day BETWEEN ? AND ?
+        GROUP BY member_id, date_day
+    ''', (start_day, start_day, end_day))
+    rows = cursor.fetchall()
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    data = np.array(rows, dtype=np.float64)
+    return data[:, 0].astype(np.int64), data[:, 1].astype(np.int64), np.nan_to_num(data[:, 2])
+
+# (회원 x 일) 부하 행렬 만들기 (같은 회원/날짜는 합산)
+def daily_load_matrix(member_ids, day_offsets, loads, days):
+    members, member_index = np.unique(member_ids, return_inverse=True)
+    flat_index = member_index * days + day_offsets
+    matrix = np.bincount(flat_index, weights=loads, minlength=len(members) * days)
+    return members, matrix.reshape(len(members), days)
+
+# 전 회원의 마지막 날 기준 급성/만성 부하와 ACWR 를 한 번에 계산
+def compute_acwr(matrix, acute_days=ACUTE_DAYS, chronic_days=CHRONIC_DAYS):
+    acute = matrix[:, -acute_days:].sum(axis=1) / acute_days
+    chronic = matrix[:, -chronic_days:].sum(axis=1) / chronic_days
+    ratio = np.divide(acute, chronic, out=np.zeros_like(acute), where=chronic > 0)
+    return acute, chronic, ratio
+
+# 전 회원의 일별 ACWR 추이 (누적합으로 이동 구간 합을 계산)
+# 반환 행렬의 열 t 는 matrix 의 chronic_days - 1 + t 번째 날 기준 값
+def rolling_acwr(matrix, acute_days=ACUTE_DAYS, chronic_days=CHRONIC_DAYS):
+    cumulative = np.zeros((matrix.shape[0], matrix.shape[1] + 1), dtype=matrix.dtype)
+    np.cumsum(matrix, axis=1, out=cumulative[:, 1:])
+
+    acute = (cumulative[:, chronic_days:] - cumulative[:, chronic_days - acute_days:-acute_days]) / acute_days
+    chronic = (cumulative[:, chronic_days:] - cumulative[:, :-chronic_days]) / chronic_days
+    return np.divide(acute, chronic, out=np.zeros_like(acute), where=chronic > 0)
+
+# 만성 기간이 시작되기 전의 운동 기록이 있는 회원만 남김
+# 기록이 만성 기간보다 짧은 신규 회원은 만성 부하가 실제보다 낮게 잡혀 ACWR 가 부풀려짐 (첫 운동 당일 ACWR 4.0)
+# 후보 ID 는 json_each 로 한 번에 넘기고 (SQL 변수 개수 제한 없음), 회원별로 member_id 로 시작하는 인덱스를 검색
+def established_members(conn, member_ids, as_of, days=CHRONIC_DAYS):
+    if len(member_ids) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    start_day = to_epoch_day(as_of) - (days - 1)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT value FROM json_each(?)
+        WHERE EXISTS (SELECT 1 FROM workout_records WHERE member_id = value AND date_day < ?)
+    ''', (json.dumps([int(member_id) for member_id in member_ids]), start_day))
+    return np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+
+# 과훈련(ACWR > 1.5) / 훈련 감소(ACWR < 0.8) 회원 찾기 (만성 기간보다 기록이 짧은 회원은 제외)
+# 반환값: [(회원 ID, 급성 부하, 만성 부하, ACWR, 상태)]
+def flag_members(conn, as_of, metric='volume'):
+    member_ids, day_offsets, loads = load_daily_arrays(conn, as_of, CHRONIC_DAYS, metric)
+    if len(member_ids) == 0:
+        return []
+
+    members, matrix = daily_load_matrix(member_ids, day_offsets, loads, CHRONIC_DAYS)
+    acute, chronic, ratio = compute_acwr(matrix)
+
+    overtraining = ratio > OVERTRAINING_RATIO
+    detraining = (chronic > 0) & (ratio < DETRAINING_RATIO)
+    candidates = overtraining | detraining
+    established = np.isin(members, established_members(conn, members[candidates], as_of))
+    flagged = np.flatnonzero(candidates & established)
+
+    return [(int(members[i]), float(acute[i]), float(chronic[i]), float(ratio[i]),
+             'overtraining' if overtraining[i] else 'detraining')
+            for i in flagged]